@@ -0,0 +1,187 @@
+from numpy import *
+
+def plane_distances(points, plane_point, plane_normal):
+	"""
+	Gets the signed distances of the given points from the given planes,
+	in units of the plane normals.
+	"""
+
+	return ((points - plane_point) * plane_normal).sum(axis=-1)
+
+
+def rotate_corners(faces, first):
+	"""
+	Rotates the corners of every face cyclically, keeping its orientation,
+	so that the given corner comes first.
+
+	Parameters
+	----------
+	faces : ndarray, shape(M, 3, ...)
+		the faces, or any values of their corners
+	first : ndarray, shape(M, )
+		the corner to bring first in every face
+
+	Returns
+	-------
+	faces : ndarray, shape(M, 3, ...)
+		the rotated faces
+	"""
+
+	corners = (first[:,newaxis] + arange(3)) % 3
+	return faces[arange(len(faces))[:,newaxis], corners]
+
+
+def cut_points(points, edges, edge_plane, plane_point, plane_normal):
+	"""
+	Gets the points where the given edges cross their planes, each edge
+	once, so that the faces sharing an edge share its cut point.
+
+	Parameters
+	----------
+	points : ndarray, shape(N, 3)
+		the vertices
+	edges : ndarray, shape(E, 2)
+		the vertex indices of the edges, crossing their planes
+	edge_plane : ndarray, shape(E, )
+		the plane of every edge
+	plane_point, plane_normal : ndarray, shape(P, 3)
+		the planes
+
+	Returns
+	-------
+	cuts : ndarray, shape(C, 3)
+		the distinct cut points
+	cut_index : ndarray, shape(E, )
+		the cut point of every edge
+	"""
+
+	keys = ascontiguousarray(column_stack([sort(edges, axis=1), edge_plane]).astype(int64))
+	keys = keys.view(dtype((void, keys.dtype.itemsize * 3))).ravel()
+	unique_keys, first, cut_index = unique(keys, return_index=True, return_inverse=True)
+
+	# the cut of every edge from its lowest vertex, the same for all its faces
+	i, j = sort(edges[first], axis=1).T
+	plane = edge_plane[first]
+	di = plane_distances(points[i], plane_point[plane], plane_normal[plane])
+	dj = plane_distances(points[j], plane_point[plane], plane_normal[plane])
+	t = (di / (di - dj))[:,newaxis]
+
+	return points[i] + t * (points[j] - points[i]), cut_index
+
+
+def compact(points, faces):
+	"""
+	Keeps only the points used by the given faces, renumbering them.
+
+	Returns
+	-------
+	points : ndarray, shape(N', 3)
+		the used points, in their order
+	faces : ndarray, shape(M, 3)
+		the renumbered faces
+	"""
+
+	used, inverse = unique(faces, return_inverse=True)
+	return points[used], inverse.reshape(-1, 3).astype(int32)
+
+
+def clip_faces(points, faces, plane_point, plane_normal, face_plane=None):
+	"""
+	Clips the given triangles by the given planes, all at once.
+
+	Every corner is classified by its signed distance from the plane of
+	its face. The triangles with no corner on the negative side, the ones
+	on the plane too, go to the positive half, and the triangles with
+	no corner on the positive side go to the negative half.
+	The triangles across the plane are split, their corners rotated
+	cyclically to keep their orientation: with one corner on the plane
+	into two triangles, one per half; with a corner alone on its side
+	into a triangle on its side and two on the other side.
+	The new vertices are shared through a table keyed by edge and plane.
+
+	Parameters
+	----------
+	points : ndarray, shape(N, 3)
+		the vertices
+	faces : ndarray, shape(M, 3)
+		the vertex indices of the triangles
+	plane_point : ndarray, shape(3, ) or shape(P, 3)
+		a point of every plane
+	plane_normal : ndarray, shape(3, ) or shape(P, 3)
+		the normal of every plane, pointing to the positive half
+	face_plane : ndarray, shape(M, )
+		the plane of every triangle, by default the first one
+
+	Returns
+	-------
+	positive, negative : tuple
+		the two halves, each one as the points (N', 3),
+		the faces (M', 3) and the source triangle of every face (M', )
+	"""
+
+	points = asarray(points, dtype=float).reshape(-1, 3)
+	faces = asarray(faces, dtype=int64).reshape(-1, 3)
+	plane_point = asarray(plane_point, dtype=float).reshape(-1, 3)
+	plane_normal = asarray(plane_normal, dtype=float).reshape(-1, 3)
+	if face_plane is None:
+		face_plane = zeros(len(faces), dtype=int64)
+	face_plane = asarray(face_plane, dtype=int64)
+
+	d = plane_distances(points[faces], plane_point[face_plane][:,newaxis], plane_normal[face_plane][:,newaxis])
+	pos = d > 0
+	neg = d < 0
+	zero = ~pos & ~neg
+	any_pos = pos.any(axis=1)
+	any_neg = neg.any(axis=1)
+	across = any_pos & any_neg
+
+	# the triangles with a corner on the plane, brought first: (Z, A, B)
+	on = flatnonzero(across & zero.any(axis=1))
+	first = argmax(zero[on], axis=1)
+	on_faces = rotate_corners(faces[on], first)
+	on_pos = rotate_corners(pos[on], first)
+
+	# the triangles with a corner alone on its side, brought first: (L, A, B)
+	lone = flatnonzero(across & ~zero.any(axis=1))
+	lone_pos = pos[lone].sum(axis=1) == 1
+	first = argmax(where(lone_pos[:,newaxis], pos[lone], neg[lone]), axis=1)
+	lone_faces = rotate_corners(faces[lone], first)
+
+	edges = concatenate([on_faces[:,[1,2]], lone_faces[:,[0,1]], lone_faces[:,[0,2]]])
+	edge_plane = concatenate([face_plane[on], face_plane[lone], face_plane[lone]])
+	cuts, cut_index = cut_points(points, edges, edge_plane, plane_point, plane_normal)
+	cut_index = cut_index + len(points)
+	all_points = concatenate([points, cuts])
+
+	c = cut_index[:len(on)]
+	ca = cut_index[len(on):len(on) + len(lone)]
+	cb = cut_index[len(on) + len(lone):]
+	z, a, b = on_faces.T
+	l, la, lb = lone_faces.T
+
+	new_faces = concatenate([
+		column_stack([z, a, c]),
+		column_stack([z, c, b]),
+		column_stack([l, ca, cb]),
+		column_stack([ca, la, lb]),
+		column_stack([ca, lb, cb])]).reshape(-1, 3)
+	new_pos = concatenate([on_pos[:,1], on_pos[:,2], lone_pos, ~lone_pos, ~lone_pos])
+	new_source = concatenate([on, on, lone, lone, lone])
+
+	halves = []
+	for whole, side in [(~any_neg, new_pos), (any_neg & ~any_pos, ~new_pos)]:
+		source = concatenate([flatnonzero(whole), new_source[side]])
+		half_faces = concatenate([faces[whole], new_faces[side]]).reshape(-1, 3)
+		half_points, half_faces = compact(all_points, half_faces)
+		halves.append((half_points, half_faces, source))
+
+	return halves[0], halves[1]
+
+
+if __name__ == "__main__":
+
+	points = [[0, 0, 1], [0, 1, -1], [1, 0, -1], [0, 0, 2], [1, 1, 0]]
+	faces = [[0, 1, 2], [0, 3, 1], [4, 1, 3]]
+	positive, negative = clip_faces(points, faces, [0, 0, 0], [0, 0, 1])
+	print "positive =>", positive
+	print "negative =>", negative
@@ -0,0 +1,352 @@
+import os
+import sys
+import json
+import traceback
+from threading import Thread
+from Queue import Empty
+from multiprocessing import Process, Queue, cpu_count
+from numpy import *
+from ShapeEuler import *
+from ParserOFF import ParserOff, triangulate
+from ParserPLY import ParserPly
+from ParserSTL import ParserStl
+from MeshCache import file_hash
+
+PARSERS = {".off": ParserOff, ".ply": ParserPly, ".stl": ParserStl}
+COMPRESSED = [".gz", ".bz2", ".xz"]
+
+def mesh_format(file_name):
+	"""
+	Gets the format of the given mesh file by its extension,
+	a compressed .off file keeping the .off format.
+
+	Returns
+	-------
+	format : String
+		the extension of the format, None for no mesh file
+	"""
+
+	name, ext = os.path.splitext(file_name.lower())
+	if ext in COMPRESSED:
+		name, ext = os.path.splitext(name)
+		if ext != ".off":
+			return None
+	if ext in PARSERS:
+		return ext
+	return None
+
+
+def find_meshes(root):
+	"""
+	Walks the directory tree from the given root, in sorted order.
+
+	Returns
+	-------
+	files : generator
+		the paths of the mesh files
+	"""
+
+	for dirpath, dirnames, filenames in os.walk(root):
+		dirnames.sort()
+		for file_name in sorted(filenames):
+			if mesh_format(file_name) is not None:
+				yield os.path.join(dirpath, file_name)
+
+
+def describe(file_path_name, fun=II_fused):
+	"""
+	Describes the given mesh file: parse, triangulate, affine euler
+	matrix and principal axes.
+
+	Parameters
+	----------
+	file_path_name : String
+		the path of the mesh file
+	fun : function
+		the fused integration kernel
+
+	Returns
+	-------
+	descriptor : dict
+		the file, the number of vertices and triangles, the affine euler
+		matrix, the barycenter and the principal axes
+	"""
+
+	parser = PARSERS[mesh_format(file_path_name)]()
+	vertices, groups = parser.parse_arrays(os.path.basename(file_path_name), os.path.dirname(file_path_name))
+	triangles, face_map = triangulate(groups)
+
+	euler, barycenter, axes = AffineEulerMatBatch(asarray(vertices)[triangles], [0, len(triangles)], fun)
+
+	return {
+		"file": file_path_name,
+		"vertices": len(vertices),
+		"triangles": len(triangles),
+		"euler": euler[0].tolist(),
+		"barycenter": barycenter[0].tolist(),
+		"axes": axes[0].tolist()
+	}
+
+
+def ingest_worker(tasks, results, fun):
+	"""
+	Describes the files got from the tasks queue until a None task,
+	putting a descriptor or an error for every file in the results queue.
+	"""
+
+	while True:
+		file_path_name = tasks.get()
+		if file_path_name is None:
+			results.put(None)
+			return
+		try:
+			stat = os.stat(file_path_name)
+			result = describe(file_path_name, fun)
+			result["size"] = stat.st_size
+			result["mtime"] = stat.st_mtime
+			result["hash"] = file_hash(file_path_name)
+		except Exception, e:
+			result = {
+				"file": file_path_name,
+				"error": "".join(traceback.format_exception_only(type(e), e)).strip()
+			}
+		results.put(result)
+
+
+def describe_all(files, processes=None, queue_size=64, fun=II_fused):
+	"""
+	Describes the given mesh files on a pool of processes,
+	yielding every descriptor as soon as it is ready.
+	
+	The files are fed to the processes by a thread through a bounded 
+	queue, and the descriptors come back through another bounded queue,
+	so that the memory used does not depend on the number of files.
+	A file that cannot be described gives a record with an error and
+	does not stop the others; a process that dies is waited for no more.
+	
+	Parameters
+	----------
+	files : iterable
+		the paths of the mesh files
+	processes : int
+		the number of processes, by default the number of cpus
+	queue_size : int
+		the bound of the queues between the stages
+	fun : function
+		the fused integration kernel
+	
+	Returns
+	-------
+	results : generator
+		the descriptors, see describe, or the errors, in order of 
+		completion, the descriptors with the size, mtime and hash 
+		of their files
+	"""
+	
+	if processes is None:
+		processes = cpu_count()
+	
+	tasks = Queue(queue_size)
+	results = Queue(queue_size)
+	
+	def feeder():
+		for file_path_name in files:
+			tasks.put(file_path_name)
+		for i in range(processes):
+			tasks.put(None)
+	
+	workers = [ Process(target=ingest_worker, args=(tasks, results, fun)) for i in range(processes) ]
+	for worker in workers:
+		worker.daemon = True
+		worker.start()
+	feed = Thread(target=feeder)
+	feed.setDaemon(True)
+	feed.start()
+	
+	finished = 0
+	crashed = 0
+	while finished + crashed < processes:
+		try:
+			result = results.get(timeout=1.0)
+		except Empty:
+			crashed = len([ worker for worker in workers if worker.exitcode not in (None, 0) ])
+			continue
+		if result is None:
+			finished += 1
+		else:
+			yield result
+	
+	if crashed == 0:
+		feed.join()
+	for worker in workers:
+		worker.join()
+
+
+def ingest(files, output, processes=None, queue_size=64, fun=II_fused):
+	"""
+	Describes the given mesh files on a pool of processes, see describe_all,
+	writing every descriptor as a JSON line in the output as soon as 
+	it is ready.
+	
+	Parameters
+	----------
+	files : iterable or String
+		the paths of the mesh files, or a directory to walk, 
+		see find_meshes
+	output : file or String
+		the output, or the path of the output file
+	processes : int
+		the number of processes, by default the number of cpus
+	queue_size : int
+		the bound of the queues between the stages
+	fun : function
+		the fused integration kernel
+	
+	Returns
+	-------
+	counts : tuple
+		the number of files described and of files failed
+	"""
+	
+	if isinstance(files, basestring):
+		files = find_meshes(files)
+	
+	out = open(output, "w") if isinstance(output, basestring) else output
+	described = 0
+	failed = 0
+	try:
+		for result in describe_all(files, processes, queue_size, fun):
+			if "error" in result:
+				failed += 1
+			else:
+				described += 1
+			out.write(json.dumps(result) + "\n")
+			out.flush()
+	finally:
+		if out is not output:
+			out.close()
+	
+	return described, failed
+
+
+def load_manifest(manifest):
+	"""
+	Loads the manifest of the given path.
+	
+	Returns
+	-------
+	files : dict
+		the record of every file, empty if there is no manifest
+	"""
+	
+	if not os.path.exists(manifest):
+		return {}
+	
+	return json.load(open(manifest, "r"))["files"]
+
+
+def save_manifest(manifest, files):
+	"""
+	Saves the manifest at the given path, replacing it at once.
+	"""
+	
+	temp = manifest + ".tmp"
+	f = open(temp, "w")
+	try:
+		json.dump({"version": 1, "files": files}, f)
+	finally:
+		f.close()
+	os.rename(temp, manifest)
+
+
+def reindex(root, manifest, processes=None, queue_size=64, fun=II_fused, save_every=100):
+	"""
+	Updates the descriptors of the mesh files under the given root, 
+	recorded in the given manifest with the size, mtime and hash of 
+	their files.
+	
+	Only the files added or changed since the manifest was saved are 
+	described again, see describe_all; the records of the deleted files 
+	are pruned. A file whose mtime changed is described again only if 
+	its size or hash changed too. The files that failed are retried.
+	
+	Parameters
+	----------
+	root : String
+		the directory to walk, see find_meshes
+	manifest : String
+		the path of the manifest, a JSON file
+	processes : int
+		the number of processes, by default the number of cpus
+	queue_size : int
+		the bound of the queues between the stages
+	fun : function
+		the fused integration kernel
+	save_every : int
+		the number of new records between two saves of the manifest
+	
+	Returns
+	-------
+	counts : dict
+		the number of files added, changed, retried, unchanged, removed 
+		and failed
+	"""
+	
+	records = load_manifest(manifest)
+	counts = {"added": 0, "changed": 0, "retried": 0, "unchanged": 0, "removed": 0, "failed": 0}
+	
+	found = set()
+	todo = []
+	for file_path_name in find_meshes(root):
+		found.add(file_path_name)
+		record = records.get(file_path_name)
+		if record is None:
+			todo.append(file_path_name)
+			counts["added"] += 1
+			continue
+		if "error" in record:
+			todo.append(file_path_name)
+			counts["retried"] += 1
+			continue
+		
+		stat = os.stat(file_path_name)
+		if record.get("size") == stat.st_size and record.get("mtime") == stat.st_mtime:
+			counts["unchanged"] += 1
+		elif record.get("size") == stat.st_size and record.get("hash") == file_hash(file_path_name):
+			record["mtime"] = stat.st_mtime
+			counts["unchanged"] += 1
+		else:
+			todo.append(file_path_name)
+			counts["changed"] += 1
+	
+	for file_path_name in records.keys():
+		if file_path_name not in found:
+			del records[file_path_name]
+			counts["removed"] += 1
+	
+	done = 0
+	for result in describe_all(todo, processes, queue_size, fun):
+		records[result["file"]] = result
+		if "error" in result:
+			counts["failed"] += 1
+		done += 1
+		if done % save_every == 0:
+			save_manifest(manifest, records)
+	
+	save_manifest(manifest, records)
+	
+	return counts
+
+
+if __name__ == "__main__":
+
+	if len(sys.argv) < 3:
+		print "usage: python Ingest.py [--reindex] <directory> <output.jsonl | manifest.json> [processes]"
+		sys.exit(1)
+
+	if sys.argv[1] == "--reindex":
+		processes = int(sys.argv[4]) if len(sys.argv) > 4 else None
+		print "reindex =>", reindex(sys.argv[2], sys.argv[3], processes)
+	else:
+		processes = int(sys.argv[3]) if len(sys.argv) > 3 else None
+		print "described, failed =>", ingest(sys.argv[1], sys.argv[2], processes)
@@ -1,18 +1,178 @@
 from numpy import *
 from pyplasm import *
 from ShapeEuler import *
+from PointIndex import PointIndex
+from Clip import clip_faces
+
+def weld(triangles, tollerance=None):
+	"""
+	Welds the coincident vertices of a triangle soup.
+	
+	Parameters
+	----------
+	triangles : ndarray, shape(M, 3, 3)
+		the triangle soup
+	tollerance : float
+		None to weld the equal vertices only, or the tollerance of 
+		Mesh.index_point: the vertices of the same grid cell and signs 
+		are welded first, and then the ones the same with the tollerance 
+		across neighbour cells, each one to the lowest, see 
+		PointIndex.find_all, or to the vertex that one is welded to
+	
+	Returns
+	-------
+	points : ndarray, shape(N, 3)
+		the distinct vertices, in order of first occurrence
+	tri_index : ndarray, shape(M, 3)
+		the vertex indices of the triangles
+	"""
+	
+	corners = ascontiguousarray(asarray(triangles, dtype=float).reshape(-1, 3)) + 0.0
+	if tollerance is None:
+		keys = corners
+	else:
+		keys = ascontiguousarray(hstack([floor(corners / tollerance), sign(corners)]).astype(int64))
+	keys = keys.view(dtype((void, keys.dtype.itemsize * keys.shape[1]))).ravel()
+	unique_keys, first, inverse = unique(keys, return_index=True, return_inverse=True)
+	
+	order = argsort(first)
+	rank = empty(len(order), dtype=int)
+	rank[order] = arange(len(order))
+	points = corners[first[order]]
+	tri_index = rank[inverse]
+	
+	if tollerance is not None and len(points) > 0:
+		grid = PointIndex(tollerance)
+		grid.insert_all(points)
+		same = grid.find_all(points, points)
+		while (same[same] != same).any():
+			same = same[same]
+		kept = same == arange(len(points))
+		rank = cumsum(kept) - 1
+		points = points[kept]
+		tri_index = rank[same][tri_index]
+	
+	return points, tri_index.reshape(-1, 3)
 
-class Mesh():
+
+class Mesh(object):
+	"""
+	Triangle mesh, with its vertices in an (N, 3) float array and its 
+	faces in an (M, 3) int32 array of vertex indices. 
+	
+	Both arrays keep a spare capacity, so that adding points and triangles
+	one at a time takes amortized constant time. The point_list and 
+	tri_index_list properties give copies of them as lists, for 
+	compatibility: they are read only, the mesh being edited through 
+	vertices, faces and the add and remove methods.
+	"""
 
 	def __init__(self, point_list, tri_index_list):
 		
 		self.current = 0
-		self.point_list = point_list
-		self.tri_index_list = tri_index_list
-		self.updated = True
-		self.euler = identity(4)
+		self.vertices = point_list
+		self.faces = tri_index_list
+		self.updated = False
+		self.euler = zeros((4, 4))
 		self.axes = identity(4)
 		self.barycenter = zeros(3)
+		self.fun = None
+		self.face_map = None
+	
+	def get_vertices(self):
+		
+		return self.point_buffer[:self.n_points]
+	
+	def set_vertices(self, point_list):
+		
+		self.point_buffer = asarray(point_list, dtype=float64).reshape(-1, 3)
+		self.n_points = len(self.point_buffer)
+		self.grid = None
+	
+	vertices = property(get_vertices, set_vertices)
+	
+	def get_faces(self):
+		
+		return self.face_buffer[:self.n_faces]
+	
+	def set_faces(self, tri_index_list):
+		
+		try:
+			faces = asarray(tri_index_list, dtype=int32)
+		except ValueError:
+			raise ValueError("the faces of a mesh must have the same number of vertices")
+		if faces.size == 0:
+			faces = faces.reshape(0, 3)
+		if faces.ndim != 2:
+			raise ValueError("the faces of a mesh must have the same number of vertices")
+		self.face_buffer = faces
+		self.n_faces = len(faces)
+		self.face_map = None
+	
+	faces = property(get_faces, set_faces)
+	
+	point_list = property(lambda self: self.vertices.tolist(), 
+		doc="A copy of the vertices as a list, read only: editing it leaves the mesh unchanged.")
+	
+	tri_index_list = property(lambda self: self.faces.tolist(), 
+		doc="A copy of the faces as a list, read only: editing it leaves the mesh unchanged.")
+	
+	def reserve(self, n_points, n_faces):
+		"""
+		Grows the capacity of this mesh to hold at least the given 
+		numbers of points and faces, doubling it, and copies the arrays
+		that are not writable, as the memory mapped ones.
+		"""
+		
+		if n_points > len(self.point_buffer) or not self.point_buffer.flags.writeable:
+			buffer = empty((max(n_points, 2 * len(self.point_buffer), 16), 3))
+			buffer[:self.n_points] = self.vertices
+			self.point_buffer = buffer
+		
+		if n_faces > len(self.face_buffer) or not self.face_buffer.flags.writeable:
+			buffer = empty((max(n_faces, 2 * len(self.face_buffer), 16), self.face_buffer.shape[1]), dtype=int32)
+			buffer[:self.n_faces] = self.faces
+			self.face_buffer = buffer
+	
+	def check_triangles(self):
+		"""
+		Checks that the faces of this mesh are triangles, as the 
+		integration and the clipping need.
+		"""
+		
+		if self.face_buffer.shape[1] != 3:
+			raise ValueError("the faces of the mesh must be triangles, not of " 
+				+ str(self.face_buffer.shape[1]) + " vertices")
+	
+	def writable_vertices(self):
+		"""
+		Gets the vertices of this mesh, copying them first if they are not
+		writable, so that they can be transformed in place.
+		The point index is dropped, since the points are going to move.
+		"""
+		
+		if not self.point_buffer.flags.writeable:
+			self.point_buffer = array(self.vertices)
+		self.grid = None
+		
+		return self.vertices
+	
+	def get_grid(self, tollerance=10**-7):
+		"""
+		Gets the spatial hash of the points of this mesh with the given
+		tollerance, building it if missing or built with another one.
+		
+		Returns
+		-------
+		grid : PointIndex
+			the spatial hash of the points of this mesh
+		"""
+		
+		if self.grid is None or self.grid.tollerance != tollerance:
+			self.grid = PointIndex(tollerance)
+			self.grid.insert_all(self.vertices)
+		
+		return self.grid
 	
 	def __repr__(self):
 		"""
@@ -25,11 +185,11 @@ class Mesh():
 		"""
 		
 		info = "\nmesh:"
-		info += "\nn triangles: " + str(len(self.tri_index_list))
-		info += "\ntriangles: \n" + str(array(self.to_list()))
-		info += "\npoints: \n" + str(array(self.point_list))
-		info += "\nindex_list \n" + str(array(self.tri_index_list))
-		info += "\nn points: " + str(len(self.point_list))
+		info += "\nn triangles: " + str(self.n_faces)
+		info += "\ntriangles: \n" + str(self.to_array())
+		info += "\npoints: \n" + str(self.vertices)
+		info += "\nindex_list \n" + str(self.faces)
+		info += "\nn points: " + str(self.n_points)
 		info += "\neuler: \n" + str(array(self.euler))
 		info += "\nbarycenter: \n" + str(array(self.barycenter))
 		info += "\naxes: \n" + str(array(self.axes))
@@ -39,7 +199,7 @@ class Mesh():
 		
 	def __getitem__(self, i):
 		
-		return [ self.point_list[index] for index in self.tri_index_list[i] ]
+		return self.vertices[self.faces[i]].tolist()
 	
 	def __iter__(self):
 		
@@ -47,7 +207,7 @@ class Mesh():
 		
 	def next(self):
 		
-		if self.current >= len(self.tri_index_list):
+		if self.current >= self.n_faces:
 			raise StopIteration
 		else:
 			self.current += 1
@@ -63,7 +223,19 @@ class Mesh():
 			triangles of this atom
 		"""
 
-		return [ [ self.point_list[index] for index in tri_index ] for tri_index in self.tri_index_list ]
+		return self.to_array().tolist()
+	
+	def to_array(self):
+		"""
+		Gets the triangles of this mesh as an array.
+		
+		Returns
+		-------
+		triangles : ndarray, shape(M, 3, 3)
+			triangles of this mesh
+		"""
+		
+		return self.vertices[self.faces]
 	
 	
 	def clone(self):
@@ -76,7 +248,12 @@ class Mesh():
 			the clone of this mesh
 		"""
 		
-		clone = Mesh(self.point_list[:], self.tri_index_list[:])
+		clone = Mesh(array(self.vertices), array(self.faces))
+		clone.euler = array(self.euler)
+		clone.barycenter = array(self.barycenter)
+		clone.fun = self.fun
+		clone.updated = self.updated
+		clone.face_map = self.face_map
 		
 		return clone
 	
@@ -98,11 +275,29 @@ class Mesh():
 			the index of the given point with the given tollerance
 		"""
 		
-		for index in range(len(self.point_list)):
-			p = array(self.point_list[index])
-			if (sign(p) == sign(array(point))).all() and (abs(p - array(point)) < tollerance).all():
-				return index 
-		return -1
+		return self.get_grid(tollerance).find(self.vertices, point)
+	
+	def index_points(self, points, tollerance=10**-7):
+		"""
+		Gets the indices of the given points with the given tollerance,
+		as index_point does, all at once.
+		
+		Parameters
+		----------
+		points : ndarray, shape(Q, 3)
+			points
+		
+		tollerance : float
+			tollerance
+		
+		Returns
+		-------
+		indices : ndarray, shape(Q, )
+			the index of every given point with the given tollerance, 
+			-1 for the points not in this mesh
+		"""
+		
+		return self.get_grid(tollerance).find_all(self.vertices, points)
 	
 	def contains_point(self, point, tollerance=10**-7):
 		"""
@@ -130,11 +325,41 @@ class Mesh():
 		index = self.index_point(point)
 		
 		if (index < 0):
-			self.point_list.append(point)
-			index = len(self.point_list) - 1
+			self.reserve(self.n_points + 1, self.n_faces)
+			self.point_buffer[self.n_points] = point
+			index = self.n_points
+			self.n_points += 1
+			self.grid.insert(index, point)
 			
 		return index
 	
+	def append_points(self, points):
+		"""
+		Appends the given points to this mesh, with no lookup,
+		growing its capacity if needed.
+		"""
+		
+		points = asarray(points, dtype=float64).reshape(-1, 3)
+		self.reserve(self.n_points + len(points), self.n_faces)
+		self.point_buffer[self.n_points:self.n_points + len(points)] = points
+		if self.grid is not None:
+			self.grid.insert_all(points, self.n_points)
+		self.n_points += len(points)
+	
+	def append_faces(self, tri_index_list):
+		"""
+		Appends the given faces to this mesh, 
+		growing its capacity if needed.
+		The added faces have no source face, -1 in the face_map.
+		"""
+		
+		faces = asarray(tri_index_list, dtype=int32).reshape(-1, self.face_buffer.shape[1])
+		self.reserve(self.n_points, self.n_faces + len(faces))
+		self.face_buffer[self.n_faces:self.n_faces + len(faces)] = faces
+		self.n_faces += len(faces)
+		if self.face_map is not None:
+			self.face_map = concatenate([asarray(self.face_map), -ones(len(faces), dtype=int64)])
+	
 	def add_tri(self, triangle):
 		"""
 		Adds the given triangle to this mesh.
@@ -151,20 +376,86 @@ class Mesh():
 			for chaining purpose
 		"""
 		
-		self.tri_index_list.append([ self.add_point(point) for point in triangle ])
+		tri_index = [ self.add_point(point) for point in triangle ]
+		self.append_faces([tri_index])
 		
-		self.updated = False
+		self.accumulate([tri_index])
 		
 		return self
 	
-	def add_all(self, triangle_list):
+	def remove_tri(self, i):
 		"""
-		Adds the given triangles to this mesh.
+		Removes the i-th triangle of this mesh, keeping its points.
 		
 		Parameters
 		----------
-		triangle_list : Triangle list
+		i : int
+			the index of the triangle to remove
+		
+		Returns
+		-------
+		self : Mesh
+			this mesh, 
+			for chaining purpose
+		"""
+		
+		if i < 0:
+			i += self.n_faces
+		if i < 0 or i >= self.n_faces:
+			raise IndexError("triangle index out of range")
+		
+		tri_index = self.faces[i].tolist()
+		self.reserve(self.n_points, self.n_faces)
+		self.face_buffer[i:self.n_faces-1] = self.face_buffer[i+1:self.n_faces]
+		self.n_faces -= 1
+		if self.face_map is not None:
+			self.face_map = delete(asarray(self.face_map), i)
+		
+		self.accumulate([tri_index], -1.0)
+		
+		return self
+	
+	def accumulate(self, tri_index_list, sign=1.0):
+		"""
+		Adds the moments of the given triangles of this mesh to its 
+		affine euler matrix, if updated, so that it stays updated after 
+		an incremental edit. 
+		
+		Parameters
+		----------
+		tri_index_list : list
+			the point indices of the triangles
+		sign : float
+			1.0 for added triangles, -1.0 for removed ones
+		
+		Returns
+		-------
+		self : Mesh
+			this mesh, 
+			for chaining purpose
+		"""
+		
+		if self.updated and len(tri_index_list) > 0:
+			surface = self.vertices[asarray(tri_index_list, dtype=int32)]
+			self.euler = self.euler + sign * array(AffineEulerMat(surface, self.fun))
+			self.update_barycenter()
+		
+		return self
+	
+	def add_all(self, triangle_list, tollerance=10**-7):
+		"""
+		Adds the given triangles to this mesh, all at once.
+		
+		The vertices of the triangles are welded on the grid of the 
+		tollerance, see weld, and then looked up among the points 
+		of this mesh, see index_points, the points not found being added.
+		
+		Parameters
+		----------
+		triangle_list : Triangle list or ndarray, shape(M, 3, 3)
 			the triangle list to add
+		tollerance : float
+			tollerance
 		
 		Returns
 		-------
@@ -173,10 +464,20 @@ class Mesh():
 			for chaining purpose
 		"""
 		
-		for triangle in triangle_list:
-			self.add(triangle)
+		points, tri_index = weld(asarray(triangle_list, dtype=float).reshape(-1, 3, 3), tollerance)
 		
-		self.updated = False
+		if self.n_points > 0:
+			indices = self.index_points(points, tollerance)
+		else:
+			indices = -ones(len(points), dtype=int64)
+		new = indices < 0
+		indices[new] = self.n_points + arange(new.sum())
+		self.append_points(points[new])
+		
+		tri_index = indices[tri_index]
+		self.append_faces(tri_index)
+		
+		self.accumulate(tri_index)
 		
 		return self
 	
@@ -190,7 +491,7 @@ class Mesh():
 			the number of triangles of this mesh
 		"""
 		
-		return len(self.tri_index_list)
+		return self.n_faces
 	
 	def rotate(self, rotation):
 		"""
@@ -208,9 +509,11 @@ class Mesh():
 			for chaining purpose
 		"""
 		
-		self.point_list = [ (dot(rotation, array(point))).tolist() for point in self.point_list ]
+		rotation = asarray(rotation, dtype=float)
+		vertices = self.writable_vertices()
+		vertices[:] = dot(vertices, rotation.T)
 		
-		self.updated = False
+		self.transform_euler(rotation, zeros(3))
 		
 		return self
 
@@ -230,9 +533,10 @@ class Mesh():
 			for chaining purpose
 		"""
 		
-		self.point_list = [ (array(point) * scale).tolist() for point in self.point_list ]
+		vertices = self.writable_vertices()
+		vertices *= scale
 		
-		self.updated = False
+		self.transform_euler(diag(ones(3) * scale), zeros(3))
 		
 		return self
 	
@@ -252,16 +556,76 @@ class Mesh():
 			for chaining purpose
 		"""
 		
-		self.point_list = [ (array(point) - translation).tolist() for point in self.point_list ]
+		translation = array(translation, dtype=float)
+		vertices = self.writable_vertices()
+		vertices -= translation
 		
-		self.updated = False
+		self.transform_euler(identity(3), -translation)
 		
 		return self
 	
+	def is_closed(self):
+		"""
+		Tests if this mesh is closed, every edge of its triangles shared 
+		by exactly two triangles.
+		
+		Returns
+		-------
+		test : boolean
+			true if this mesh is closed, false otherwise
+		"""
+		
+		if self.n_faces == 0 or self.face_buffer.shape[1] != 3:
+			return False
+		
+		faces = asarray(self.faces, dtype=int64)
+		edges = sort(concatenate([faces[:,[0,1]], faces[:,[1,2]], faces[:,[2,0]]]), axis=1)
+		keys = edges[:,0] * self.n_points + edges[:,1]
+		counts = unique(keys, return_counts=True)[1]
+		
+		return bool((counts == 2).all())
 	
-	def get_euler(self):
+	def transform_euler(self, matrix, translation):
 		"""
-		Gets the affine euler matrix of this mesh.
+		Keeps the affine euler matrix and the barycenter of this mesh 
+		valid under the map x -> matrix x + translation, 
+		marking this mesh as not updated when they cannot be transformed:
+		the volume integrals are transformed only for a closed mesh, 
+		see is_closed and TransformEulerMat.
+		
+		Parameters
+		----------
+		matrix : ndarray, shape(3, 3)
+			the linear part of the map
+		translation : ndarray, shape(3, )
+			the translation part of the map
+		
+		Returns
+		-------
+		self : Mesh
+			this mesh,
+			for chaining purpose
+		"""
+		
+		if self.updated:
+			kind = getattr(self.fun, "kind", None)
+			if kind == "volume" and not self.is_closed():
+				euler = None
+			else:
+				euler = TransformEulerMat(self.euler, matrix, translation, kind)
+			if euler is None:
+				self.updated = False
+			else:
+				self.euler = euler
+				self.update_barycenter()
+		
+		return self
+	
+	
+	def get_euler(self, fun=II_fused):
+		"""
+		Gets the affine euler matrix of this mesh,
+		updating this mesh if needed.
 		
 		Returns
 		-------
@@ -269,11 +633,15 @@ class Mesh():
 			the affine euler matrix of this mesh
 		"""
 		
+		if not self.updated:
+			self.update(fun)
+		
 		return self.euler
 	
-	def get_barycenter(self):
+	def get_barycenter(self, fun=II_fused):
 		"""
-		Gets the barycenter of this mesh.
+		Gets the barycenter of this mesh,
+		updating this mesh if needed.
 		
 		Returns
 		-------
@@ -281,9 +649,12 @@ class Mesh():
 			the barycenter of this mesh
 		"""
 		
+		if not self.updated:
+			self.update(fun)
+		
 		return self.barycenter
 	
-	def update(self, fun=II):
+	def update(self, fun=II_fused):
 		"""
 		Updates this mesh.
 		
@@ -294,14 +665,34 @@ class Mesh():
 				for chaning purpose
 		"""
 		
-		self.euler = array(AffineEulerMat(self.to_list(), fun))
-		self.barycenter = (array(self.euler[-1]) / self.euler[-1][-1])[:-1]
+		self.check_triangles()
+		self.euler = array(AffineEulerMat(self.to_array(), fun))
+		self.fun = fun
+		self.update_barycenter()
 		
 		self.updated = True
 		
 		return self
 	
-	def get_principal_axes(self, fun=II):
+	def update_barycenter(self):
+		"""
+		Updates the barycenter of this mesh from its affine euler matrix.
+		
+		Returns
+		-------
+			self : Mesh
+				this mesh,
+				for chaning purpose
+		"""
+		
+		if self.euler[-1][-1] == 0:
+			self.barycenter = zeros(3)
+		else:
+			self.barycenter = (array(self.euler[-1]) / self.euler[-1][-1])[:-1]
+		
+		return self
+	
+	def get_principal_axes(self, fun=II_fused):
 		"""
 		Gets the principal axes of this mesh.
 		
@@ -322,7 +713,7 @@ class Mesh():
 		
 		return axes
 	
-	def align(self, fun=II):
+	def align(self, fun=II_fused):
 		"""
 		Align this mesh by its principal axis.
 		
@@ -342,8 +733,6 @@ class Mesh():
 		
 		self.translate(self.get_barycenter()).rotate(self.get_principal_axes())
 		
-		self.updated = False
-		
 		return self
 		
 	def to_plasm(self):
@@ -360,290 +749,54 @@ class Mesh():
 		
 		return struct
 
-	def split_z(self):
-	
-		tri_list = self.to_list()
-	
-		z_positive_mesh = Mesh([],[])
-		z_negative_mesh = Mesh([],[])
+	def split(self, point, normal):
+		"""
+		Splits this mesh by the plane of the given point and normal,
+		see Clip.clip_faces: the triangles on the plane go to the 
+		positive half. After align, the principal planes are the ones
+		through the origin with normals the coordinate axes.
 		
-		z_pos_mesh_point_list = []
-		z_pos_mesh_tri_list = [] 
+		Parameters
+		----------
+		point : ndarray, shape(3, )
+			a point of the plane
+		normal : ndarray, shape(3, )
+			the normal of the plane, pointing to the positive half
 		
-		z_neg_mesh_point_list = []
-		z_neg_mesh_tri_list = []
+		Returns
+		-------
+		positive, negative : Mesh
+			the two halves of this mesh, with the face of this mesh
+			of every triangle in their face_map, composed with the 
+			face_map of this mesh if any: -1 for the triangles added
+			to this mesh
+		"""
+		
+		self.check_triangles()
+		if self.face_map is not None and len(self.face_map) != self.n_faces:
+			raise ValueError("the face_map of the mesh does not match its faces")
+		halves = []
+		for points, faces, source in clip_faces(self.vertices, self.faces, point, normal):
+			half = Mesh(points, faces)
+			if self.face_map is None:
+				half.face_map = source
+			else:
+				half.face_map = asarray(self.face_map)[source]
+			halves.append(half)
 		
-		z_cli_mesh_point_list = []
-		z_cli_mesh_tri_list = []
+		return halves[0], halves[1]
+	
+	def split_z(self):
+		"""
+		Splits this mesh by the xy-plane, see split.
 		
-		for tri in tri_list:
-			[point0,point1,point2] = tri
-			# index0 = tri_index[0]
-			# index1 = tri_index[1]
-			# index2 = tri_index[2]
-			# 
-			# point0 = self.point_list[0]
-			# point1 = self.point_list[1]
-			# point2 = self.point_list[2]
-			
-			[x1,y1,z1] = point0
-			[x2,y2,z2] = point1
-			[x3,y3,z3] = point2
-			
-			if z1 >= 0 and z2 >= 0 and z3 >= 0:
-				new_tri = [-1,-1,-1]
-				
-				if not point0 in z_pos_mesh_point_list:
-					z_pos_mesh_point_list.append(point0)
-				new_tri[0] = z_pos_mesh_point_list.index(point0)
-				
-				if not point1 in z_pos_mesh_point_list:
-					z_pos_mesh_point_list.append(point1)
-				new_tri[1] = z_pos_mesh_point_list.index(point1)
-				
-				if not point2 in z_pos_mesh_point_list:
-					z_pos_mesh_point_list.append(point2)
-				new_tri[2] = z_pos_mesh_point_list.index(point2)
-				
-				z_pos_mesh_tri_list.append(new_tri)
-				
-			elif (z1 < 0 and z2 < 0 and z3 < 0) or (z1 == 0 and z2 == 0 and z3 == 0):
-				new_tri = [-1,-1,-1]
-				
-				if not point0 in z_neg_mesh_point_list:
-					z_neg_mesh_point_list.append(point0)
-				new_tri[0] = z_neg_mesh_point_list.index(point0)
-				
-				if not point1 in z_neg_mesh_point_list:
-					z_neg_mesh_point_list.append(point1)
-				new_tri[1] = z_neg_mesh_point_list.index(point1)
-				
-				if not point2 in z_neg_mesh_point_list:
-					z_neg_mesh_point_list.append(point2)
-				new_tri[2] = z_neg_mesh_point_list.index(point2)
-				
-				z_neg_mesh_tri_list.append(new_tri)
-				
-			else:
-				new_tri = [-1,-1,-1]
-				
-				if not point0 in z_cli_mesh_point_list:
-					z_cli_mesh_point_list.append(point0)
-				new_tri[0] = z_cli_mesh_point_list.index(point0)
-				
-				if not point1 in z_cli_mesh_point_list:
-					z_cli_mesh_point_list.append(point1)
-				new_tri[1] = z_cli_mesh_point_list.index(point1)
-				
-				if not point2 in z_cli_mesh_point_list:
-					z_cli_mesh_point_list.append(point2)
-				new_tri[2] = z_cli_mesh_point_list.index(point2)
-				
-				z_cli_mesh_tri_list.append(new_tri)
-		
-		for tri_index in z_cli_mesh_tri_list:
-			
-			point0 = z_cli_mesh_point_list[tri_index[0]]
-			point1 = z_cli_mesh_point_list[tri_index[1]]
-			point2 = z_cli_mesh_point_list[tri_index[2]]
-			
-			[x1,y1,z1] = point0
-			[x2,y2,z2] = point1
-			[x3,y3,z3] = point2
-			
-			tri = [point0, point1, point2]
+		Returns
+		-------
+		positive, negative : Mesh
+			the halves of this mesh with z >= 0 and with z <= 0
+		"""
 		
-			#if there is one vertex on xy-plane
-			if (int(z1 == 0) + int(z2 == 0) + int(z3 == 0)) == 1: 
-			
-				pos_ver = filter(lambda (x,y,z): z > 0, tri)[0]
-				neg_ver = filter(lambda (x,y,z): z < 0, tri)[0]
-			
-				# begin math stuff...
-				pos_ver = array(pos_ver)
-				neg_ver = array(neg_ver)
-			
-				line = pos_ver - neg_ver
-				t = -1 * line[2]
-				point_a = neg_ver + t * line
-			
-				line = pos_ver - neg_ver
-				t = -1 * neg_ver[2] / line[2]
-				point_b = neg_ver + t * line
-			
-				pos_ver = pos_ver.tolist()
-				neg_ver = neg_ver.tolist()
-				# end math stuff!
-			
-				new_pos_tri = tri[:]
-				new_pos_tri[new_pos_tri.index(neg_ver)] = pos_ver
-			
-				new_neg_tri = tri[:]
-				new_neg_tri[new_pos_tri.index(pos_ver)] = neg_ver
-
-				#z_positive_mesh.add_tri(new_pos_tri)
-				new_tri = [-1,-1,-1]
-				point0 = new_pos_tri[0]
-				point1 = new_pos_tri[1]
-				point2 = new_pos_tri[2]
-				
-				if not point0 in z_pos_mesh_point_list:
-					z_pos_mesh_point_list.append(point0)
-				new_tri[0] = z_pos_mesh_point_list.index(point0)
-				
-				if not point1 in z_pos_mesh_point_list:
-					z_pos_mesh_point_list.append(point1)
-				new_tri[1] = z_pos_mesh_point_list.index(point1)
-				
-				if not point2 in z_pos_mesh_point_list:
-					z_pos_mesh_point_list.append(point2)
-				new_tri[2] = z_pos_mesh_point_list.index(point2)
-				
-				z_pos_mesh_tri_list.append(new_tri)
-				
-				#z_negative_mesh.add_tri(neg_new_tri)
-				new_tri = [-1,-1,-1]
-				point0 = new_neg_tri[0]
-				point1 = new_neg_tri[1]
-				point2 = new_neg_tri[2]
-				
-				if not point0 in z_neg_mesh_point_list:
-					z_neg_mesh_point_list.append(point0)
-				new_tri[0] = z_neg_mesh_point_list.index(point0)
-				
-				if not point1 in z_neg_mesh_point_list:
-					z_neg_mesh_point_list.append(point1)
-				new_tri[1] = z_neg_mesh_point_list.index(point1)
-				
-				if not point2 in z_neg_mesh_point_list:
-					z_neg_mesh_point_list.append(point2)
-				new_tri[2] = z_neg_mesh_point_list.index(point2)
-				
-				z_neg_mesh_tri_list.append(new_tri)
-				
-			else: 
-				
-				pos_ver = filter(lambda (x,y,z): z > 0, tri)
-				neg_ver = filter(lambda (x,y,z): z < 0, tri)
-				
-				if len(pos_ver) == 2:
-					one_ver = neg_ver[0]
-					two_ver = pos_ver
-				else:
-					one_ver = pos_ver[0]
-					two_ver = neg_ver
-				
-				# begin math stuff...
-				two_ver_0 = array(two_ver[0])
-				two_ver_1 = array(two_ver[1])
-				one_ver = array(one_ver)
-				
-				line_a = two_ver_0 - one_ver
-				t_a = -1 * one_ver[2] / line_a[2]
-				point_a = one_ver + t_a * line_a
-			
-				line_b = two_ver_1 - one_ver
-				t_b = -1 * one_ver[2] / line_b[2]
-				point_b = one_ver + t_b * line_b 
-			
-				two_ver_0 = two_ver_0.tolist()
-				two_ver_1 = two_ver_1.tolist()
-				one_ver = one_ver.tolist()
-				point_a = point_a.tolist()
-				point_b = point_b.tolist()
-				# end math stuff!
-			
-				#pay attention to normals direction
-				one_new_tri = tri[:]
-				one_new_tri[one_new_tri.index(two_ver_0)] = point_a
-				one_new_tri[one_new_tri.index(two_ver_1)] = point_b
-
-				two_new_tri = [tri[:], tri[:]]
-				two_new_tri[0][two_new_tri[0].index(one_ver)] = point_a
-				two_new_tri[0][two_new_tri[0].index(two_ver_1)] = point_b
-				two_new_tri[1][two_new_tri[1].index(one_ver)] = point_b
-
-				if (int(z1>0) + int(z2>0) + int(z3>0)) < 2:
-					to_add_one_point_list = z_pos_mesh_point_list
-					to_add_one_tri_list = z_pos_mesh_tri_list
-					
-					to_add_two_point_list = z_neg_mesh_point_list
-					to_add_two_tri_list = z_neg_mesh_tri_list
-				else:
-					to_add_one_point_list = z_neg_mesh_point_list
-					to_add_one_tri_list = z_neg_mesh_tri_list
-					
-					to_add_two_point_list = z_pos_mesh_point_list
-					to_add_two_tri_list = z_pos_mesh_tri_list
-
-				#to_add_one.add_tri(one_new_tri)
-				new_tri = [-1,-1,-1]
-				point0 = one_new_tri[0]
-				point1 = one_new_tri[1]
-				point2 = one_new_tri[2]
-				
-				if not point0 in to_add_one_point_list:
-					to_add_one_point_list.append(point0)
-				new_tri[0] = to_add_one_point_list.index(point0)
-				
-				if not point1 in to_add_one_point_list:
-					to_add_one_point_list.append(point1)
-				new_tri[1] = to_add_one_point_list.index(point1)
-				
-				if not point2 in to_add_one_point_list:
-					to_add_one_point_list.append(point2)
-				new_tri[2] = to_add_one_point_list.index(point2)
-				
-				to_add_one_tri_list.append(new_tri)
-				
-				#to_add_two.add_tri(two_new_tri[0])
-				new_tri = [-1,-1,-1]
-				point0 = two_new_tri[0][0]
-				point1 = two_new_tri[0][1]
-				point2 = two_new_tri[0][2]
-				
-				if not point0 in to_add_two_point_list:
-					to_add_two_point_list.append(point0)
-				new_tri[0] = to_add_two_point_list.index(point0)
-				
-				if not point1 in to_add_two_point_list:
-					to_add_two_point_list.append(point1)
-				new_tri[1] = to_add_two_point_list.index(point1)
-				
-				if not point2 in to_add_two_point_list:
-					to_add_two_point_list.append(point2)
-				new_tri[2] = to_add_two_point_list.index(point2)
-				
-				to_add_two_tri_list.append(new_tri)
-				
-				#to_add_two.add_tri(two_new_tri[1])
-				new_tri = [-1,-1,-1]
-				point0 = two_new_tri[1][0]
-				point1 = two_new_tri[1][1]
-				point2 = two_new_tri[1][2]
-				
-				if not point0 in to_add_two_point_list:
-					to_add_two_point_list.append(point0)
-				new_tri[0] = to_add_two_point_list.index(point0)
-				
-				if not point1 in to_add_two_point_list:
-					to_add_two_point_list.append(point1)
-				new_tri[1] = to_add_two_point_list.index(point1)
-				
-				if not point2 in to_add_two_point_list:
-					to_add_two_point_list.append(point2)
-				new_tri[2] = to_add_two_point_list.index(point2)
-				
-				to_add_two_tri_list.append(new_tri)
-				
-		
-		z_positive_mesh.point_list = z_pos_mesh_point_list
-		z_positive_mesh.tri_index_list = z_pos_mesh_tri_list
-		
-		z_negative_mesh.point_list = z_neg_mesh_point_list
-		z_negative_mesh.tri_index_list = z_neg_mesh_tri_list
-		
-		return z_positive_mesh, z_negative_mesh
+		return self.split(zeros(3), [0, 0, 1])
 
 if __name__ == "__main__":
 	
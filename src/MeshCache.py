@@ -0,0 +1,234 @@
+import os
+import json
+import hashlib
+import tempfile
+from numpy import *
+from ParserOFF import flatten_faces, unflatten_faces
+
+def file_hash(file_path_name, block_size=2**20):
+	"""
+	Computes the sha1 hash of the content of the given file.
+
+	Returns
+	-------
+	hash : String
+		the hexadecimal digest of the file content
+	"""
+
+	h = hashlib.sha1()
+	f = open(file_path_name, "rb")
+	try:
+		block = f.read(block_size)
+		while block:
+			h.update(block)
+			block = f.read(block_size)
+	finally:
+		f.close()
+
+	return h.hexdigest()
+
+
+class MeshCache():
+	"""
+	On-disk cache of parsed meshes.
+
+	Every parsed file gets a binary sidecar in the cache directory:
+	the vertex array, the number of vertices of every face and the
+	flattened vertex indices, as .npy files loaded by memory mapping,
+	and a .json entry with the path, size, mtime and content hash
+	of the source file.
+	"""
+
+	def __init__(self, cache_dir=None, max_bytes=2**30):
+		"""
+		Parameters
+		----------
+		cache_dir : String
+			the cache directory, by default ~/.cache/ShapeEuler
+		max_bytes : int
+			the bound on the size of the cache directory, the least
+			recently used entries being evicted past it
+		"""
+
+		if cache_dir is None:
+			cache_dir = os.path.join(os.path.expanduser("~"), ".cache", "ShapeEuler")
+		if not os.path.isdir(cache_dir):
+			os.makedirs(cache_dir)
+
+		self.descr = "Cache of parsed meshes"
+		self.cache_dir = cache_dir
+		self.max_bytes = max_bytes
+
+	def __repr__(self):
+		"""
+		Gets the info of this cache.
+
+		Returns
+		-------
+		info : String
+			info of this cache
+		"""
+
+		info = "{\n"
+		info += "descr: " + self.descr + "\n"
+		info += "cache_dir: " + self.cache_dir + "\n"
+		info += "max_bytes: " + str(self.max_bytes) + "\n"
+		info += "}"
+
+		return info
+
+	def key(self, file_path_name):
+		"""
+		Gets the key of the entry of the given source file.
+		"""
+
+		return hashlib.sha1(os.path.abspath(file_path_name)).hexdigest()
+
+	def entry_files(self, key):
+		"""
+		Gets the files of the entry with the given key.
+		"""
+
+		prefix = os.path.join(self.cache_dir, key)
+		return [ prefix + suffix for suffix in [".json", ".vertices.npy", ".arity.npy", ".indices.npy"] ]
+
+	def load(self, file_path_name):
+		"""
+		Loads the arrays of the given source file from the cache.
+
+		The entry is valid if the source has the recorded size and mtime,
+		or else the recorded content hash.
+
+		Parameters
+		----------
+		file_path_name : String
+			the path of the source file
+
+		Returns
+		-------
+		arrays : tuple
+			the vertices and the grouped faces, as ParserOff.parse_arrays
+			returns them, or None if the entry is missing or stale
+		"""
+
+		meta_file, vertices_file, arity_file, indices_file = self.entry_files(self.key(file_path_name))
+		try:
+			meta = json.load(open(meta_file, "r"))
+		except (IOError, ValueError):
+			return None
+
+		stat = os.stat(file_path_name)
+		if meta["size"] != stat.st_size:
+			return None
+		if meta["mtime"] != stat.st_mtime:
+			if meta["hash"] != file_hash(file_path_name):
+				return None
+			meta["mtime"] = stat.st_mtime
+			self.write_meta(meta_file, meta)
+
+		try:
+			vertices = load(vertices_file, mmap_mode="r")
+			arity = load(arity_file, mmap_mode="r")
+			indices = load(indices_file, mmap_mode="r")
+		except (IOError, ValueError):
+			return None
+
+		# marks the entry as recently used
+		os.utime(meta_file, None)
+
+		return vertices, unflatten_faces(arity, indices)
+
+	def store(self, file_path_name, vertices, groups):
+		"""
+		Stores the arrays of the given source file in the cache,
+		evicting the least recently used entries past the size bound.
+
+		Parameters
+		----------
+		file_path_name : String
+			the path of the source file
+		vertices : ndarray, shape(N, 3)
+			the coordinates of the vertices
+		groups : dict
+			the faces grouped by number of vertices
+		"""
+
+		stat = os.stat(file_path_name)
+		meta = {
+			"path": os.path.abspath(file_path_name),
+			"size": stat.st_size,
+			"mtime": stat.st_mtime,
+			"hash": file_hash(file_path_name)
+		}
+		arity, indices = flatten_faces(groups)
+
+		meta_file, vertices_file, arity_file, indices_file = self.entry_files(self.key(file_path_name))
+		for name, data in [(vertices_file, asarray(vertices, dtype=float64)),
+				(arity_file, arity), (indices_file, indices)]:
+			fd, temp = tempfile.mkstemp(dir=self.cache_dir)
+			f = os.fdopen(fd, "wb")
+			try:
+				save(f, data)
+			finally:
+				f.close()
+			os.rename(temp, name)
+		# the entry is written last, so that it is valid only when complete
+		self.write_meta(meta_file, meta)
+
+		self.evict()
+
+	def write_meta(self, meta_file, meta):
+
+		fd, temp = tempfile.mkstemp(dir=self.cache_dir)
+		f = os.fdopen(fd, "w")
+		try:
+			json.dump(meta, f)
+		finally:
+			f.close()
+		os.rename(temp, meta_file)
+
+	def evict(self):
+		"""
+		Evicts the least recently used entries until the cache directory
+		is within its size bound.
+		"""
+
+		entries = []
+		total = 0
+		for name in os.listdir(self.cache_dir):
+			if not name.endswith(".json"):
+				continue
+			files = self.entry_files(name[:-len(".json")])
+			size = sum([ os.path.getsize(f) for f in files if os.path.exists(f) ])
+			entries.append((os.path.getmtime(files[0]), size, files))
+			total += size
+
+		for used, size, files in sorted(entries):
+			if total <= self.max_bytes:
+				break
+			for f in files:
+				if os.path.exists(f):
+					os.remove(f)
+			total -= size
+
+	def clear(self):
+		"""
+		Removes all the entries of this cache.
+		"""
+
+		max_bytes = self.max_bytes
+		self.max_bytes = -1
+		self.evict()
+		self.max_bytes = max_bytes
+
+
+if __name__ == "__main__":
+
+	from ParserOFF import ParserOff
+	import time
+
+	parser = ParserOff(MeshCache())
+	for i in range(2):
+		start = time.time()
+		vertices, groups = parser.parse_arrays("camel.off")
+		print "parse_arrays(camel.off)", i, "=>", time.time() - start, "seconds"
@@ -0,0 +1,138 @@
+import os
+import struct
+from numpy import *
+import ShapeEuler
+from Mesh import Mesh
+
+## Native mesh file layout, little endian:
+## header of HEADER_SIZE bytes:
+##   magic, version, flags, n vertices, n faces,
+##   vertex offset, face offset, euler offset, name of the euler function
+## vertices : float64 (n vertices, 3), at vertex offset
+## faces    : int32 (n faces, 3), at face offset
+## euler    : float64 (4, 4), at euler offset, if flags & HAS_EULER
+
+MAGIC = "SEMESH\0\0"
+VERSION = 1
+HAS_EULER = 1
+HEADER = struct.Struct("<8sIIQQQQQ16s")
+HEADER_SIZE = 128
+ALIGN = 64
+
+def align(offset):
+	
+	return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+def write_mesh(mesh, file_path_name, euler=True):
+	"""
+	Writes the given mesh in the native mesh file format.
+	
+	Parameters
+	----------
+	mesh : Mesh
+		the mesh to write, with triangular faces
+	file_path_name : String
+		the path of the file to write
+	euler : boolean
+		true to write the affine euler matrix of the mesh too,
+		if it is updated
+	"""
+	
+	vertices = ascontiguousarray(mesh.vertices, dtype=float64)
+	faces = mesh.faces
+	if faces.shape[1] != 3:
+		if len(faces) > 0:
+			raise ValueError("the native mesh file format needs triangular faces")
+		faces = faces.reshape(0, 3)
+	faces = ascontiguousarray(faces, dtype=int32)
+	
+	flags = 0
+	fun_name = ""
+	if euler and mesh.updated and getattr(ShapeEuler, getattr(mesh.fun, "__name__", ""), None) is mesh.fun:
+		flags |= HAS_EULER
+		fun_name = mesh.fun.__name__
+	
+	vertex_offset = HEADER_SIZE
+	face_offset = align(vertex_offset + vertices.nbytes)
+	euler_offset = align(face_offset + faces.nbytes)
+	
+	f = open(file_path_name, "wb")
+	try:
+		f.write(HEADER.pack(MAGIC, VERSION, flags, len(vertices), len(faces), 
+			vertex_offset, face_offset, euler_offset, fun_name).ljust(HEADER_SIZE, "\0"))
+		f.write(vertices.astype("<f8").tostring())
+		f.write("\0" * (face_offset - vertex_offset - vertices.nbytes))
+		f.write(faces.astype("<i4").tostring())
+		if flags & HAS_EULER:
+			f.write("\0" * (euler_offset - face_offset - faces.nbytes))
+			f.write(asarray(mesh.euler, dtype="<f8").tostring())
+	finally:
+		f.close()
+
+
+def read_mesh(file_path_name, mode="r"):
+	"""
+	Reads a mesh from the native mesh file format.
+	
+	The vertices and the faces of the mesh are memory mapped on the file,
+	with no copy: only the pages read are loaded.
+	
+	Parameters
+	----------
+	file_path_name : String
+		the path of the file to read
+	mode : String
+		the memmap mode, "r" for read only arrays, 
+		"c" for copy on write ones
+	
+	Returns
+	-------
+	mesh : Mesh
+		the mesh, updated if the file holds its affine euler matrix
+	"""
+	
+	f = open(file_path_name, "rb")
+	try:
+		header = f.read(HEADER.size)
+	finally:
+		f.close()
+	
+	if len(header) < HEADER.size:
+		raise ValueError("not a native mesh file: " + file_path_name)
+	magic, version, flags, n_vertices, n_faces, vertex_offset, face_offset, euler_offset, fun_name = \
+		HEADER.unpack(header)
+	if magic != MAGIC:
+		raise ValueError("not a native mesh file: " + file_path_name)
+	if version > VERSION:
+		raise ValueError("unsupported native mesh file version: " + str(version))
+	
+	if n_vertices > 0:
+		vertices = memmap(file_path_name, dtype="<f8", mode=mode, offset=vertex_offset, shape=(n_vertices, 3))
+	else:
+		vertices = zeros((0, 3))
+	if n_faces > 0:
+		faces = memmap(file_path_name, dtype="<i4", mode=mode, offset=face_offset, shape=(n_faces, 3))
+	else:
+		faces = zeros((0, 3), dtype=int32)
+	
+	mesh = Mesh(vertices, faces)
+	
+	fun = getattr(ShapeEuler, fun_name.rstrip("\0"), None)
+	if flags & HAS_EULER and fun is not None:
+		mesh.euler = array(memmap(file_path_name, dtype="<f8", mode="r", offset=euler_offset, shape=(4, 4)))
+		mesh.fun = fun
+		mesh.update_barycenter()
+		mesh.updated = True
+	
+	return mesh
+
+
+if __name__ == "__main__":
+	
+	from ParserOFF import ParserOff
+	
+	mesh = ParserOff().parse("tetra.off").update()
+	write_mesh(mesh, "tetra.mesh")
+	print read_mesh("tetra.mesh")
+	os.remove("tetra.mesh")
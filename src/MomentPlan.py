@@ -0,0 +1,206 @@
+from numpy import *
+from ShapeEuler import *
+
+def exponents_of_order(order):
+	"""
+	Gets all the exponent triples of the given total degree.
+
+	Parameters
+	----------
+	order : int
+		the total degree alpha + beta + gamma
+
+	Returns
+	-------
+	exponents : list
+		the exponent triples [alpha, beta, gamma], in lexicographic
+		descending order
+	"""
+
+	return [ [alpha, beta, order - alpha - beta]
+			for alpha in range(order, -1, -1)
+				for beta in range(order - alpha, -1, -1) ]
+
+
+class MomentPlan():
+	"""
+	Compiled plan for the integration of a set of monomials.
+
+	T3 expands the integral of x^alpha y^beta z^gamma on a triangle
+	into a polynomial in the first vertex t0 and in the edge vectors
+	a = t1 - t0, b = t2 - t0. The plan expands these polynomials once
+	for all the exponent triples, with binomial and M tables built
+	ahead, and merges them on a shared pool of monomials.
+	Running the plan is then a product of the monomial values
+	by a coefficient matrix, for any number of meshes.
+	"""
+
+	def __init__(self, exponents=exps, volume=False):
+		"""
+		Compiles the plan for the given exponent triples.
+
+		Parameters
+		----------
+		exponents : list
+			the exponent triples [alpha, beta, gamma] to integrate
+		volume : boolean
+			true to integrate on the volume bounded by the surface
+			as III does, false to integrate on the surface as II does
+		"""
+
+		self.exponents = [ list(e) for e in exponents ]
+		self.volume = volume
+		self.fused = self.exponents == exps
+		self.kind = "volume" if volume else "surface"
+
+		# the volume integrals need one more degree on x
+		shift = int(volume)
+		self.degree = max([ sum(e) for e in self.exponents ] + [0]) + shift
+		n = self.degree + 1
+
+		self.binomial = zeros((n + 1, n + 1))
+		for i in range(n + 1):
+			self.binomial[i,0] = 1.0
+			for j in range(1, i + 1):
+				self.binomial[i,j] = self.binomial[i-1,j-1] + self.binomial[i-1,j]
+
+		self.m_table = zeros((n, n))
+		for alpha in range(n):
+			for beta in range(n - alpha):
+				signs = array([ (-1)**h for h in range(alpha + 2) ])
+				self.m_table[alpha,beta] = (self.binomial[alpha+1,:alpha+2] * signs
+					/ (arange(alpha + 2) + beta + 1.0)).sum() / (alpha + 1)
+
+		# monomials over (t0x, t0y, t0z, ax, bx, ay, by, az, bz)
+		monomials = {}
+		terms = []
+		for (alpha, beta, gamma) in self.exponents:
+			terms.append(self._expand(alpha + shift, beta, gamma, monomials))
+
+		self.powers = zeros((len(monomials), 9), dtype=int)
+		for powers, index in monomials.items():
+			self.powers[index] = powers
+
+		self.coefs = zeros((len(monomials), len(self.exponents)))
+		for column, term in enumerate(terms):
+			for index, coef in term.items():
+				self.coefs[index,column] += coef
+
+		if volume:
+			self.coefs /= array([ e[0] + 1.0 for e in self.exponents ])
+
+	def __repr__(self):
+		"""
+		Gets the info of this plan.
+
+		Returns
+		-------
+		info : String
+			info of this plan
+		"""
+
+		info = "\nmoment plan:"
+		info += "\nexponents: " + str(self.exponents)
+		info += "\nvolume: " + str(self.volume)
+		info += "\ndegree: " + str(self.degree)
+		info += "\nn monomials: " + str(len(self.powers))
+
+		return info
+
+	def _expand(self, alpha, beta, gamma, monomials):
+
+		C = self.binomial
+		term = {}
+		for h in range(alpha+1):
+			for k in range(beta+1):
+				for m in range(gamma+1):
+					c1 = C[alpha,h] * C[beta,k] * C[gamma,m]
+					for i in range(h+1):
+						for j in range(k+1):
+							for l in range(m+1):
+								powers = (alpha-h, beta-k, gamma-m, h-i, i, k-j, j, m-l, l)
+								index = monomials.setdefault(powers, len(monomials))
+								term[index] = term.get(index, 0.0) + c1 * C[h,i] * C[k,j] * C[m,l] \
+									* self.m_table[h+k+m-i-j-l,i+j+l]
+		return term
+
+	def run(self, surface, reduce=True, chunk_size=4096):
+		"""
+		Runs this plan on the given surface.
+
+		Parameters
+		----------
+		surface : list or ndarray
+			a list of triples of surface vertices (3D points)
+		reduce : boolean
+			true to sum the integrals over the surface,
+			false to get the integrals on every triangle
+		chunk_size : int
+			the number of triangles evaluated together,
+			bounding the size of the monomial table
+
+		Returns
+		-------
+		vals : ndarray, shape(E, ) or shape(M, E)
+			the integrals of the monomials in the order of the exponents
+		"""
+
+		t = as_triangles(surface)
+		vals = empty((len(t), len(self.exponents)))
+
+		for start in range(0, len(t), chunk_size):
+			vals[start:start+chunk_size] = self._run_chunk(t[start:start+chunk_size])
+
+		if reduce:
+			return vals.sum(axis=0)
+		return vals
+
+	def _run_chunk(self, t):
+
+		a = t[:,1] - t[:,0]
+		b = t[:,2] - t[:,0]
+		c = cross(a, b)
+		variables = [t[:,0,0], t[:,0,1], t[:,0,2], a[:,0], b[:,0], a[:,1], b[:,1], a[:,2], b[:,2]]
+
+		monomials = ones((len(self.powers), len(t)))
+		for v in range(9):
+			table = variables[v][newaxis,:] ** arange(self.degree + 1)[:,newaxis]
+			monomials *= table[self.powers[:,v]]
+
+		vals = dot(monomials.T, self.coefs)
+		if self.volume:
+			vals *= c[:,0][:,newaxis]
+		else:
+			vals *= ((c*c).sum(axis=1) ** 0.5)[:,newaxis]
+
+		return vals
+
+	def __call__(self, surface, reduce=True):
+
+		return self.run(surface, reduce)
+
+
+if __name__ == "__main__":
+
+	t0 = [[1, 0, 0], [0, 0, 0], [1, 1, 0]]
+	t1 = [[1, 1, 0], [0, 0, 0], [0, 1, 0]]
+	t2 = [[0, 0, 1], [1, 0, 1], [1, 1, 1]]
+	t3 = [[0, 0, 1], [1, 1, 1], [0, 1, 1]]
+	t4 = [[0, 0, 0], [1, 0, 0], [1, 0, 1]]
+	t5 = [[0, 0, 0], [1, 0, 1], [0, 0, 1]]
+	t6 = [[1, 1, 0], [0, 1, 0], [1, 1, 1]]
+	t7 = [[1, 1, 1], [0, 1, 0], [0, 1, 1]]
+	t8 = [[0, 0, 0], [0, 1, 1], [0, 1, 0]]
+	t9 = [[0, 0, 0], [0, 0, 1], [0, 1, 1]]
+	t10 = [[1, 1, 1], [1, 0, 0], [1, 1, 0]]
+	t11 = [[1, 0, 1], [1, 0, 0], [1, 1, 1]]
+	cube = [t0, t1, t2, t3, t4, t5, t6, t7, t8, t9, t10, t11]
+
+	plan = MomentPlan()
+	print plan
+	print "AffineEulerMat(cube, plan) => ", AffineEulerMat(cube, plan), "\n"
+	print "AffineEulerMat(cube, II) => ", AffineEulerMat(cube, II), "\n"
+
+	plan = MomentPlan(exponents_of_order(4), volume=True)
+	print plan
+	print "plan.run(cube) => ", plan.run(cube), "\n"
@@ -0,0 +1,225 @@
+from multiprocessing import Pool, cpu_count
+from numpy import *
+from ShapeEuler import *
+from Clip import clip_faces, compact
+
+# the positions of the 10 integrals in the affine euler matrix
+EULER_INDEX = array([[0,1,2,3], [1,4,5,6], [2,5,7,8], [3,6,8,9]])
+
+def cell_values(points, faces, cell, n_cells, fun=II_fused):
+	"""
+	Computes the 10 integrals of the affine euler matrix of every cell,
+	for all the triangles at once, with a segmented reduction by cell.
+
+	Parameters
+	----------
+	points : ndarray, shape(N, 3)
+		the vertices
+	faces : ndarray, shape(M, 3)
+		the vertex indices of the triangles
+	cell : ndarray, shape(M, )
+		the cell of every triangle
+	n_cells : int
+		the number of cells
+	fun : function
+		a fused kernel, as II_fused or III_tetra
+
+	Returns
+	-------
+	values : ndarray, shape(n_cells, 10)
+		the integrals of every cell, in the order of exps,
+		zero for the empty cells
+	"""
+
+	if len(faces) == 0:
+		return zeros((n_cells, 10))
+
+	vals = fun(points[faces], reduce=False)
+
+	return array([ bincount(cell, weights=vals[:,k], minlength=n_cells) for k in range(10) ]).T
+
+
+def cell_planes(values, axis):
+	"""
+	Gets the principal plane of every cell, through its barycenter and
+	normal to its principal axis of the given rank, by increasing
+	eigenvalue of the central moments. The normal is oriented with
+	its largest component positive.
+
+	Parameters
+	----------
+	values : ndarray, shape(C, 10)
+		the integrals of the cells, see cell_values
+	axis : int
+		the rank of the principal axis, 0, 1 or 2
+
+	Returns
+	-------
+	points, normals : ndarray, shape(C, 3)
+		a point and the normal of the plane of every cell
+	"""
+
+	euler = values[:,EULER_INDEX]
+	mass = euler[:,3,3]
+	barycenter = zeros((len(values), 3))
+	nonzero = mass != 0
+	barycenter[nonzero] = euler[nonzero,3,:3] / mass[nonzero,newaxis]
+
+	central = euler[:,:3,:3] - mass[:,newaxis,newaxis] * barycenter[:,:,newaxis] * barycenter[:,newaxis,:]
+	normals = linalg.eigh(central)[1][:,:,axis]
+	largest = argmax(abs(normals), axis=1)
+	normals *= sign(normals[arange(len(normals)),largest])[:,newaxis]
+
+	return barycenter, normals
+
+
+def split_cells(points, faces, cell, values, level):
+	"""
+	Splits every cell in two by its principal plane of the given level,
+	see cell_planes, all the cells in one clipping pass, see clip_faces.
+	The children of the cell i are 2i, on the positive side, and 2i+1.
+
+	Returns
+	-------
+	points, faces, cell : ndarray
+		the vertices, the triangles and the cells of the triangles
+		of the next level
+	"""
+
+	plane_point, plane_normal = cell_planes(values, level % 3)
+	positive, negative = clip_faces(points, faces, plane_point, plane_normal, cell)
+
+	pos_points, pos_faces, pos_source = positive
+	neg_points, neg_faces, neg_source = negative
+
+	return (concatenate([pos_points, neg_points]),
+		concatenate([pos_faces, neg_faces + len(pos_points)]),
+		concatenate([2 * cell[pos_source], 2 * cell[neg_source] + 1]))
+
+
+def decompose(points, faces, depth, fun=II_fused, level=0):
+	"""
+	Decomposes a mesh by recursive principal planes, one level at a time:
+	the cell of a level is split in two by its principal plane,
+	normal to its principal axis of rank level % 3.
+
+	Parameters
+	----------
+	points : ndarray, shape(N, 3)
+		the vertices
+	faces : ndarray, shape(M, 3)
+		the vertex indices of the triangles
+	depth : int
+		the number of levels to split
+	fun : function
+		a fused kernel, as II_fused or III_tetra
+	level : int
+		the level of the root, choosing the axes of the planes
+
+	Returns
+	-------
+	levels : list
+		the integrals of the cells of every level, see cell_values,
+		as depth + 1 arrays of shape(2^l, 10), breadth first
+	"""
+
+	points = asarray(points, dtype=float).reshape(-1, 3)
+	faces = asarray(faces, dtype=int64).reshape(-1, 3)
+	cell = zeros(len(faces), dtype=int64)
+
+	levels = []
+	for l in range(depth + 1):
+		values = cell_values(points, faces, cell, 2**l, fun)
+		levels.append(values)
+		if l < depth:
+			points, faces, cell = split_cells(points, faces, cell, values, level + l)
+
+	return levels
+
+
+def decompose_worker((points, faces, depth, fun, level)):
+
+	return decompose(points, faces, depth, fun, level)
+
+
+def octree_descriptor(mesh, depth, fun=II_fused, processes=1):
+	"""
+	Gets the hierarchical descriptor of the given mesh: the 10 integrals
+	of the affine euler matrix of every cell of its decomposition by
+	recursive principal planes, see decompose.
+
+	With more processes, the first levels are split here until there
+	are at least as many cells as processes, and the subtrees of these
+	cells are decomposed on a pool of processes.
+
+	Parameters
+	----------
+	mesh : Mesh
+		the mesh, with triangular faces
+	depth : int
+		the number of levels to split
+	fun : function
+		a fused kernel, as II_fused or III_tetra
+	processes : int
+		the number of processes, None for the number of cpus
+
+	Returns
+	-------
+	descriptor : ndarray, shape(10 * (2^(depth+1) - 1), )
+		the integrals of all the cells, breadth first,
+		zero for the empty cells
+	"""
+
+	if not getattr(fun, "fused", False):
+		raise ValueError("octree_descriptor needs a fused kernel")
+	if processes is None:
+		processes = cpu_count()
+
+	mesh.check_triangles()
+	points = asarray(mesh.vertices, dtype=float)
+	faces = asarray(mesh.faces, dtype=int64)
+
+	top = 0
+	while 2**top < processes and top < depth:
+		top += 1
+
+	if top == 0:
+		levels = decompose(points, faces, depth, fun)
+	else:
+		levels = []
+		cell = zeros(len(faces), dtype=int64)
+		for l in range(top):
+			values = cell_values(points, faces, cell, 2**l, fun)
+			levels.append(values)
+			points, faces, cell = split_cells(points, faces, cell, values, l)
+
+		tasks = []
+		for i in range(2**top):
+			cell_points, cell_faces = compact(points, faces[cell == i])
+			tasks.append((cell_points, cell_faces, depth - top, fun, top))
+
+		pool = Pool(processes)
+		try:
+			subtrees = pool.map(decompose_worker, tasks)
+		finally:
+			pool.close()
+			pool.join()
+
+		# the cell j of the subtree i at a relative level is the cell i 2^l + j
+		for l in range(depth - top + 1):
+			levels.append(concatenate([ subtree[l] for subtree in subtrees ]))
+
+	return concatenate(levels).ravel()
+
+
+if __name__ == "__main__":
+
+	import time
+	from ParserOFF import ParserOff
+
+	mesh = ParserOff().parse("camel.off").align()
+	for processes in [1, 2]:
+		start = time.time()
+		descriptor = octree_descriptor(mesh, 4, processes=processes)
+		print "octree_descriptor(camel.off, 4, processes=" + str(processes) + ") =>", \
+			len(descriptor), "values in", time.time() - start, "seconds"
@@ -1,12 +1,668 @@
 import os
 import re
+import gzip
+import bz2
+from itertools import islice
+from multiprocessing import Pool, cpu_count
+from multiprocessing.sharedctypes import RawArray
+from ctypes import c_double, c_int32
 from Mesh import *
 
+try:
+	import lzma
+except ImportError:
+	try:
+		from backports import lzma
+	except ImportError:
+		lzma = None
+
+COMPRESSIONS = [("\x1f\x8b", "gzip"), ("BZh", "bz2"), ("\xfd7zXZ\x00", "xz")]
+
+def compression(file_path_name):
+	"""
+	Detects the compression of the given file by its magic bytes.
+	
+	Returns
+	-------
+	compression : String
+		"gzip", "bz2" or "xz", None for a plain file
+	"""
+	
+	f = open(file_path_name, "rb")
+	try:
+		magic = f.read(6)
+	finally:
+		f.close()
+	
+	for prefix, name in COMPRESSIONS:
+		if magic.startswith(prefix):
+			return name
+	return None
+
+
+def open_file(file_path_name):
+	"""
+	Opens the given file for reading, decompressing it on the fly 
+	if it is compressed by gzip, bz2 or xz, with no temporary copy.
+	
+	Returns
+	-------
+	f : file
+		the file object, reading the decompressed bytes
+	"""
+	
+	kind = compression(file_path_name)
+	if kind == "gzip":
+		return gzip.GzipFile(file_path_name, "rb")
+	if kind == "bz2":
+		return bz2.BZ2File(file_path_name, "rb")
+	if kind == "xz":
+		if lzma is None:
+			raise ValueError("the lzma module is needed to read " + file_path_name)
+		return lzma.LZMAFile(file_path_name, "rb")
+	return open(file_path_name, "rb")
+
+
+def filter_lines(lines):
+	"""
+	Filters the lines of a .off file, skipping the blank lines 
+	and the comments.
+	
+	Parameters
+	----------
+	lines : iterable
+		the lines to filter
+	
+	Returns
+	-------
+	lines : generator
+		the lines holding data
+	"""
+	
+	data = re.compile('[a-zA-Z0-9]')
+	for line in lines:
+		if line[:1].isdigit() or (data.search(line) and not line.startswith(('#', '\n', '\r'))):
+			yield line
+
+
+def count_tokens(text, lengths):
+	"""
+	Counts the tokens of every line of the given lines joined by a space,
+	on their bytes at once: a token starts at every byte above the space
+	following a byte up to the space.
+	
+	Parameters
+	----------
+	text : String
+		the lines, joined by a space
+	lengths : list
+		the length of every line
+	
+	Returns
+	-------
+	counts : ndarray, shape(L, )
+		the number of tokens of every line
+	"""
+	
+	space = frombuffer(text, dtype=uint8) <= 32
+	if len(space) == 0:
+		return zeros(len(lengths), dtype=int64)
+	first = flatnonzero(space[:-1] & ~space[1:]) + 1
+	if not space[0]:
+		first = concatenate([[0], first])
+	
+	lengths = asarray(lengths, dtype=int64)
+	starts = cumsum(lengths + 1) - lengths - 1
+	
+	return diff(append(searchsorted(first, starts), len(first)))
+
+
+def parse_rows(lines, dtype=float):
+	"""
+	Parses the given lines as rows of numbers.
+	
+	All the lines are tokenised at once, then split by the number 
+	of tokens of every line, counted on the bytes of all the lines 
+	at once, see count_tokens.
+	
+	Parameters
+	----------
+	lines : list
+		the lines to parse
+	dtype : type
+		the type of the numbers
+	
+	Returns
+	-------
+	rows : ndarray, shape(L, K) or list
+		the rows, as an array when they have the same length, 
+		as a list of arrays otherwise
+	"""
+	
+	if len(lines) == 0:
+		return zeros((0, 0), dtype=dtype)
+	
+	text = " ".join(lines)
+	values = fromstring(text, sep=" ")
+	counts = count_tokens(text, map(len, lines))
+	if len(values) != counts.sum():
+		return [ array(line.split(), dtype=float).astype(dtype) for line in lines ]
+	
+	if (counts == counts[0]).all():
+		return values.reshape(len(lines), counts[0]).astype(dtype)
+	
+	return split(values.astype(dtype), cumsum(counts)[:-1])
+
+
+def group_faces(rows):
+	"""
+	Groups the parsed face records by their number of vertices.
+	
+	Parameters
+	----------
+	rows : ndarray, shape(F, K) or list
+		the face records, as parse_rows returns them: the number of 
+		vertices, the vertex indices and optional trailing values
+	
+	Returns
+	-------
+	groups : dict
+		for every number of vertices k, the pair of the vertex indices 
+		of the faces, shape(F_k, k), and of their positions in rows
+	"""
+	
+	if isinstance(rows, list):
+		arities = array([ row[0] for row in rows ], dtype=int)
+	else:
+		arities = asarray(rows[:,0], dtype=int) if len(rows) > 0 else zeros(0, dtype=int)
+	
+	groups = {}
+	for k in unique(arities):
+		source = flatnonzero(arities == k)
+		if isinstance(rows, list):
+			faces = array([ rows[i][1:k+1] for i in source ], dtype=int).reshape(-1, k)
+		else:
+			faces = rows[source,1:k+1]
+		groups[k] = (faces, source)
+	
+	return groups
+
+
+def flatten_faces(groups):
+	"""
+	Flattens the faces grouped by number of vertices, see group_faces,
+	back in their original order.
+	
+	Returns
+	-------
+	arity : ndarray, shape(F, )
+		the number of vertices of every face
+	indices : ndarray, shape(sum(arity), )
+		the vertex indices of all the faces, one face after the other
+	"""
+	
+	face_count = sum([ len(source) for faces, source in groups.values() ])
+	arity = zeros(face_count, dtype=int32)
+	for k, (faces, source) in groups.items():
+		arity[source] = k
+	
+	offsets = cumsum(arity) - arity
+	indices = zeros(arity.sum(), dtype=int32)
+	for k, (faces, source) in groups.items():
+		indices[offsets[source][:,newaxis] + arange(k)] = faces
+	
+	return arity, indices
+
+
+def unflatten_faces(arity, indices):
+	"""
+	Groups the flattened faces by number of vertices, see flatten_faces.
+	
+	When all the faces have the same number of vertices, the faces 
+	are a view on indices, with no copy.
+	
+	Returns
+	-------
+	groups : dict
+		the faces grouped by number of vertices, see group_faces
+	"""
+	
+	arity = asarray(arity)
+	if len(arity) == 0:
+		return {}
+	if (arity == arity[0]).all():
+		k = int(arity[0])
+		return { k : (indices.reshape(-1, k), arange(len(arity))) }
+	
+	offsets = cumsum(arity) - arity
+	groups = {}
+	for k in unique(arity):
+		source = flatnonzero(arity == k)
+		groups[int(k)] = (indices[offsets[source][:,newaxis] + arange(k)], source)
+	
+	return groups
+
+
+def fan_triangulate(faces):
+	"""
+	Triangulates faces with the same number of vertices by a fan 
+	around their first vertex.
+	
+	Parameters
+	----------
+	faces : ndarray, shape(F, K)
+		the vertex indices of the faces
+	
+	Returns
+	-------
+	triangles : ndarray, shape(F * (K-2), 3)
+		the vertex indices of the triangles, the ones of every face
+		one after the other
+	"""
+	
+	faces = asarray(faces)
+	k = faces.shape[1]
+	fan = array([ faces[:,[0, i, i+1]] for i in range(1, k-1) ])
+	
+	return fan.transpose(1, 0, 2).reshape(-1, 3)
+
+def triangulate(groups):
+	"""
+	Triangulates the faces grouped by number of vertices, see group_faces,
+	by a fan around their first vertex, a whole group at once.
+	
+	Returns
+	-------
+	triangles : ndarray, shape(M, 3)
+		the vertex indices of the triangles, in the order of their faces
+	face_map : ndarray, shape(M, )
+		the index of the face of every triangle
+	"""
+	
+	triangles = [zeros((0, 3), dtype=int)]
+	face_map = [zeros(0, dtype=int)]
+	for k, (faces, source) in groups.items():
+		if k < 3:
+			continue
+		triangles.append(fan_triangulate(faces))
+		face_map.append(repeat(source, k - 2))
+	
+	triangles = concatenate(triangles)
+	face_map = concatenate(face_map)
+	order = argsort(face_map, kind="mergesort")
+	
+	return triangles[order], face_map[order]
+
+
+def untriangulate(triangles, face_map):
+	"""
+	Recovers the faces triangulated by triangulate.
+	
+	Returns
+	-------
+	face_list : list
+		the vertex indices of the faces
+	"""
+	
+	triangles = asarray(triangles)
+	face_list = []
+	for face, start, stop in zip(*unique_runs(face_map)):
+		fan = triangles[start:stop]
+		face_list.append([fan[0,0]] + fan[:,1].tolist() + [fan[-1,2]])
+	
+	return face_list
+
+
+def unique_runs(values):
+	"""
+	Gets the runs of equal consecutive values.
+	
+	Returns
+	-------
+	runs : tuple
+		the value, start and stop of every run
+	"""
+	
+	values = asarray(values)
+	if len(values) == 0:
+		return [], [], []
+	starts = concatenate([[0], flatnonzero(values[1:] != values[:-1]) + 1])
+	stops = concatenate([starts[1:], [len(values)]])
+	
+	return values[starts].tolist(), starts.tolist(), stops.tolist()
+
+
+def build_mesh(vertices, groups, triangulate_faces=True):
+	"""
+	Builds the mesh of the given parsed arrays.
+	
+	Parameters
+	----------
+	vertices : ndarray, shape(N, 3)
+		the coordinates of the vertices
+	groups : dict
+		the faces grouped by number of vertices, see group_faces
+	triangulate_faces : boolean
+		true to triangulate the faces, see triangulate, 
+		keeping the face of every triangle in the face_map of the mesh; 
+		false to keep the faces as they are, 
+		all with the same number of vertices
+	
+	Returns
+	-------
+	mesh : Mesh
+		the mesh of the vertices and faces
+	"""
+	
+	if triangulate_faces:
+		triangles, face_map = triangulate(groups)
+		mesh = Mesh(vertices, triangles)
+		mesh.face_map = face_map
+		return mesh
+	
+	if len(groups) > 1:
+		raise ValueError("faces with different numbers of vertices need triangulation")
+	if len(groups) == 0:
+		return Mesh(vertices, [])
+	
+	return Mesh(vertices, groups.values()[0][0])
+
+
+def read_records(f, count):
+	"""
+	Reads the given number of data lines from the current position 
+	of the given file, skipping blank lines and comments.
+	
+	Returns
+	-------
+	lines : list
+		the data lines read, fewer than count at the end of the file
+	"""
+	
+	lines = []
+	while len(lines) < count:
+		line = f.readline()
+		if not line:
+			break
+		lines.extend(filter_lines([line]))
+	
+	return lines
+
+
+class OffHandle():
+	"""
+	Handle of a .off file whose header only has been read.
+	
+	The vertices and the faces are read on demand, seeking to their 
+	blocks; the byte offset of the face block is known once the vertex 
+	block has been gone through.
+	"""
+	
+	def __init__(self, file_path_name):
+		
+		self.file_path_name = file_path_name
+		
+		f = open_file(file_path_name)
+		try:
+			header = read_records(f, 2)
+			if len(header) < 2:
+				raise ValueError("not a .off file: " + file_path_name)
+			counts = map(lambda x: int(x), header[1].split())
+			self.vertex_count = counts[0]
+			self.face_count = counts[1]
+			self.edge_count = counts[2] if len(counts) > 2 else 0
+			self.vertex_offset = f.tell()
+		finally:
+			f.close()
+		
+		self.face_offset = None
+		self.vertices = None
+		self.groups = None
+	
+	def __repr__(self):
+		"""
+		Gets the info of this handle.
+		
+		Returns
+		-------
+		info : String
+			info of this handle
+		"""
+		
+		info = "{\n"
+		info += "file: " + self.file_path_name + "\n"
+		info += "vertex_count: " + str(self.vertex_count) + "\n"
+		info += "face_count: " + str(self.face_count) + "\n"
+		info += "edge_count: " + str(self.edge_count) + "\n"
+		info += "vertex_offset: " + str(self.vertex_offset) + "\n"
+		info += "face_offset: " + str(self.face_offset) + "\n"
+		info += "}"
+		
+		return info
+	
+	def iter_vertices(self, chunk_size=65536):
+		"""
+		Iterates over the vertices in chunks of the given size,
+		recording the byte offset of the face block.
+		
+		Returns
+		-------
+		chunks : generator
+			the chunks of vertices, ndarray shape(chunk_size, 3)
+		"""
+		
+		f = open_file(self.file_path_name)
+		try:
+			f.seek(self.vertex_offset)
+			for start in range(0, self.vertex_count, chunk_size):
+				rows = parse_rows(read_records(f, min(chunk_size, self.vertex_count - start)))
+				if isinstance(rows, list):
+					rows = array([ row[:3] for row in rows ])
+				yield rows[:,:3].reshape(-1, 3)
+			self.face_offset = f.tell()
+		finally:
+			f.close()
+	
+	def get_vertices(self):
+		"""
+		Gets the vertices, reading them on the first call.
+		
+		Returns
+		-------
+		vertices : ndarray, shape(N, 3)
+			the coordinates of the vertices
+		"""
+		
+		if self.vertices is None:
+			chunks = list(self.iter_vertices())
+			self.vertices = concatenate(chunks) if chunks else zeros((0, 3))
+		
+		return self.vertices
+	
+	def get_faces(self):
+		"""
+		Gets the faces, reading them on the first call.
+		
+		Returns
+		-------
+		groups : dict
+			the faces grouped by number of vertices, see group_faces
+		"""
+		
+		if self.groups is None:
+			if self.face_offset is None:
+				f = open_file(self.file_path_name)
+				try:
+					f.seek(self.vertex_offset)
+					for start in range(0, self.vertex_count, 65536):
+						read_records(f, min(65536, self.vertex_count - start))
+					self.face_offset = f.tell()
+				finally:
+					f.close()
+			
+			f = open_file(self.file_path_name)
+			try:
+				f.seek(self.face_offset)
+				self.groups = group_faces(parse_rows(read_records(f, self.face_count), int))
+			finally:
+				f.close()
+		
+		return self.groups
+	
+	def bounding_box(self, chunk_size=65536):
+		"""
+		Gets the bounding box of the vertices, in a single pass 
+		over the vertex block, without keeping the vertices.
+		
+		Returns
+		-------
+		box : ndarray, shape(2, 3)
+			the minimum and maximum coordinates,
+			None for no vertices
+		"""
+		
+		box = None
+		chunks = [self.vertices] if self.vertices is not None else self.iter_vertices(chunk_size)
+		for chunk in chunks:
+			if len(chunk) == 0:
+				continue
+			low = chunk.min(axis=0)
+			high = chunk.max(axis=0)
+			if box is None:
+				box = array([low, high])
+			else:
+				box = array([minimum(box[0], low), maximum(box[1], high)])
+		
+		return box
+	
+	def to_mesh(self, triangulate_faces=True):
+		"""
+		Gets the mesh of this file.
+		
+		Parameters
+		----------
+		triangulate_faces : boolean
+			true to triangulate the faces, see build_mesh
+		
+		Returns
+		-------
+		mesh : Mesh
+			the mesh of the vertices and faces
+		"""
+		
+		return build_mesh(self.get_vertices(), self.get_faces(), triangulate_faces)
+
+
+## --------------------------------------------------
+## --Parallel parsing--------------------------------
+## --------------------------------------------------
+
+parallel_shared = {}
+
+def parallel_init(vertices, faces, width):
+	"""
+	Initializes a parsing process with the shared output arrays,
+	inherited by the process instead of being pickled.
+	"""
+	
+	parallel_shared["vertices"] = vertices
+	parallel_shared["faces"] = faces
+	parallel_shared["width"] = width
+
+
+def read_range(file_path_name, start, stop):
+	
+	f = open(file_path_name, "rb")
+	try:
+		f.seek(start)
+		return list(filter_lines(f.read(stop - start).splitlines(True)))
+	finally:
+		f.close()
+
+
+def count_range(args):
+	"""
+	Counts the data lines of a byte range and their maximum number 
+	of tokens.
+	"""
+	
+	file_path_name, start, stop = args
+	lines = read_range(file_path_name, start, stop)
+	width = max([ len(line.split()) for line in lines ] + [0])
+	
+	return len(lines), width
+
+
+def parse_range(args):
+	"""
+	Parses the data lines of a byte range in the shared arrays,
+	the first line being the first-th record after the header.
+	"""
+	
+	file_path_name, start, stop, first, vertex_count, face_count = args
+	lines = read_range(file_path_name, start, stop)
+	
+	# records [0, vertex_count) are vertices, 
+	# [vertex_count, vertex_count+face_count) faces
+	n_vertices = max(0, min(len(lines), vertex_count - first))
+	if n_vertices > 0:
+		rows = parse_rows(lines[:n_vertices])
+		if isinstance(rows, list):
+			rows = array([ row[:3] for row in rows ])
+		vertices = frombuffer(parallel_shared["vertices"], dtype=float).reshape(-1, 3)
+		vertices[first:first+n_vertices] = rows[:,:3]
+	
+	face_first = max(0, first - vertex_count)
+	n_faces = max(0, min(len(lines) - n_vertices, face_count - face_first))
+	if n_faces > 0:
+		rows = parse_rows(lines[n_vertices:n_vertices+n_faces], int32)
+		width = parallel_shared["width"]
+		faces = frombuffer(parallel_shared["faces"], dtype=int32).reshape(-1, width)
+		if isinstance(rows, list):
+			for i, row in enumerate(rows):
+				faces[face_first+i,:len(row)] = row
+		else:
+			faces[face_first:face_first+n_faces,:rows.shape[1]] = rows
+
+
+def split_range(file_path_name, start, stop, parts):
+	"""
+	Splits a byte range of a file in the given number of ranges,
+	each made of whole lines.
+	
+	Returns
+	-------
+	bounds : list
+		the bounds of the ranges
+	"""
+	
+	bounds = [start]
+	f = open(file_path_name, "rb")
+	try:
+		for i in range(1, parts):
+			offset = max(start + (stop - start) * i // parts, bounds[-1])
+			f.seek(offset)
+			f.readline()
+			bounds.append(min(f.tell(), stop))
+	finally:
+		f.close()
+	bounds.append(stop)
+	
+	return [ (bounds[i], bounds[i+1]) for i in range(parts) if bounds[i] < bounds[i+1] ]
+
+
 class ParserOff():
 	
-	def __init__(self):
+	def __init__(self, cache=None):
+		"""
+		Parameters
+		----------
+		cache : MeshCache
+			the cache of the parsed files, None for no cache
+		"""
 		
 		self.descr = "Parser for .off file"
+		self.cache = cache
 	
 	def __repr__(self):
 		"""
@@ -24,7 +680,7 @@ class ParserOff():
 		
 		return info
 	
-	def parse(self, file_name, file_path="../resources"):
+	def parse(self, file_name, file_path="../resources", triangulate_faces=True):
 		"""
 		Parses the file .off with the given name in the given path.
 		
@@ -34,6 +690,8 @@ class ParserOff():
 			the name of the file to parse
 		file_path : String
 			the path of the file to parse
+		triangulate_faces : boolean
+			true to triangulate the faces, see build_mesh
 			
 		Returns
 		-------
@@ -41,25 +699,225 @@ class ParserOff():
 			the mesh of which have been parsed the coordinates of the vertices
 		"""
 		
+		vertices, groups = self.parse_arrays(file_name, file_path)
+		
+		return build_mesh(vertices, groups, triangulate_faces)
+	
+	def inspect(self, file_name, file_path="../resources"):
+		"""
+		Inspects the file .off with the given name in the given path, 
+		reading its header only.
+		
+		Parameters
+		----------
+		file_name : String
+			the name of the file to inspect
+		file_path : String
+			the path of the file to inspect
+			
+		Returns
+		-------
+		handle : OffHandle
+			the handle of the file, loading vertices and faces on demand
+		"""
+		
+		return OffHandle(os.path.join(file_path, file_name))
+	
+	def parse_arrays(self, file_name, file_path="../resources"):
+		"""
+		Parses the file .off with the given name in the given path 
+		into arrays.
+		
+		The whole file is read at once and the vertex and face blocks are
+		tokenised in bulk, see parse_rows. A compressed file is decoded 
+		on the fly while it is read, see open_file.
+		
+		Parameters
+		----------
+		file_name : String
+			the name of the file to parse
+		file_path : String
+			the path of the file to parse
+			
+		Returns
+		-------
+		vertices : ndarray, shape(N, 3)
+			the coordinates of the vertices
+		groups : dict
+			the faces grouped by number of vertices, see group_faces
+		"""
+		
 		file_path_name = os.path.join(file_path, file_name)
-		file_lines = open(file_path_name, "r").readlines()
-
-		filtered_lines = \
-			filter(lambda s: not(s.startswith('#')),
-				(filter(lambda s: not(s.startswith('\n')),
-					(filter(lambda s: not(s.startswith('\r')), 
-						(filter(lambda s: re.findall('([a-z]|[A-Z]|[0-9])+', s), file_lines)))
-					))
-				))
 		
-		vertex_count, face_count, edge_count = map(lambda x: int(x), re.split(' +', filtered_lines[1].strip()))
-		vertex_list = map(lambda x: map(lambda y: float(y), re.split(' +', x.strip())), filtered_lines[2:vertex_count+2])
-		face_et_al_list = map( lambda x: map( lambda y: int(float(y)), re.split('[ ]+', x.strip())), filtered_lines[vertex_count+2:vertex_count+2+face_count])
-		face_list = [ l[1:l[0]+1] for l in face_et_al_list]
+		if self.cache is not None:
+			cached = self.cache.load(file_path_name)
+			if cached is not None:
+				return cached
 		
-		mesh = Mesh(vertex_list, face_list)
+		f = open_file(file_path_name)
+		try:
+			filtered_lines = list(filter_lines(f.read().splitlines(True)))
+		finally:
+			f.close()
+		vertices, groups = self.parse_lines(filtered_lines)
 		
-		return mesh
+		if self.cache is not None:
+			self.cache.store(file_path_name, vertices, groups)
+		
+		return vertices, groups
+	
+	def parse_parallel(self, file_name, file_path="../resources", processes=None, ranges_per_process=4):
+		"""
+		Parses the file .off with the given name in the given path 
+		into arrays, with a pool of processes.
+		
+		After the header, the file is split in byte ranges made of whole
+		lines. The processes first count the records of every range, 
+		giving the position of its first record, then parse the ranges 
+		in shared arrays, where the records are stitched in order.
+		
+		Parameters
+		----------
+		file_name : String
+			the name of the file to parse
+		file_path : String
+			the path of the file to parse
+		processes : int
+			the number of processes, by default the number of cpus
+		ranges_per_process : int
+			the number of byte ranges given to every process
+			
+		Returns
+		-------
+		vertices : ndarray, shape(N, 3)
+			the coordinates of the vertices
+		groups : dict
+			the faces grouped by number of vertices, see group_faces
+		"""
+		
+		file_path_name = os.path.join(file_path, file_name)
+		if compression(file_path_name) is not None:
+			# a compressed stream has no byte ranges to split
+			return self.parse_arrays(file_name, file_path)
+		handle = OffHandle(file_path_name)
+		vertex_count, face_count = handle.vertex_count, handle.face_count
+		
+		if processes is None:
+			processes = cpu_count()
+		ranges = split_range(file_path_name, handle.vertex_offset, os.path.getsize(file_path_name), 
+			processes * ranges_per_process)
+		
+		pool = Pool(processes)
+		try:
+			counts = pool.map(count_range, [ (file_path_name, start, stop) for start, stop in ranges ])
+		finally:
+			pool.close()
+			pool.join()
+		
+		firsts = cumsum([0] + [ count for count, width in counts ])
+		width = max([ width for count, width in counts ] + [1])
+		shared_vertices = RawArray(c_double, 3 * vertex_count)
+		shared_faces = RawArray(c_int32, width * face_count)
+		
+		pool = Pool(processes, parallel_init, (shared_vertices, shared_faces, width))
+		try:
+			pool.map(parse_range, [ (file_path_name, start, stop, firsts[i], vertex_count, face_count) 
+				for i, (start, stop) in enumerate(ranges) ])
+		finally:
+			pool.close()
+			pool.join()
+		
+		vertices = frombuffer(shared_vertices, dtype=float).reshape(-1, 3)
+		rows = frombuffer(shared_faces, dtype=int32).reshape(-1, width)
+		
+		return vertices, group_faces(rows)
+	
+	def parse_lines(self, filtered_lines):
+		"""
+		Parses the filtered lines of a .off file into arrays,
+		the second line being the header with the counts.
+		
+		Returns
+		-------
+		vertices : ndarray, shape(N, 3)
+			the coordinates of the vertices
+		groups : dict
+			the faces grouped by number of vertices, see group_faces
+		"""
+		
+		vertex_count, face_count = map(lambda x: int(x), filtered_lines[1].split())[:2]
+		
+		rows = parse_rows(filtered_lines[2:vertex_count+2])
+		if isinstance(rows, list):
+			rows = array([ row[:3] for row in rows ])
+		vertices = rows[:,:3].reshape(-1, 3)
+		
+		rows = parse_rows(filtered_lines[vertex_count+2:vertex_count+2+face_count], int)
+		groups = group_faces(rows)
+		
+		return vertices, groups
+	
+	def stream_euler(self, file_name, file_path="../resources", fun=II_fused, chunk_size=65536):
+		"""
+		Computes the affine euler matrix of the .off file with the given 
+		name in the given path, streaming its faces.
+		
+		The vertices are read in an array, with no list of coordinates; 
+		the faces are read in chunks of the given size, summing 
+		the moments of every chunk, without building the mesh.
+		Polygonal faces are triangulated by a fan.
+		
+		Parameters
+		----------
+		file_name : String
+			the name of the file to parse
+		file_path : String
+			the path of the file to parse
+		fun : function
+			the integration function
+		chunk_size : int
+			the number of lines read at once
+			
+		Returns
+		-------
+		euler : ndarray, shape(4, 4)
+			the affine euler matrix of the mesh
+		barycenter : ndarray, shape(3, )
+			the barycenter of the mesh
+		"""
+		
+		file_path_name = os.path.join(file_path, file_name)
+		f = open_file(file_path_name)
+		try:
+			lines = filter_lines(f)
+			
+			header = list(islice(lines, 2))
+			vertex_count, face_count = map(lambda x: int(x), header[1].split())[:2]
+			
+			vertices = empty((vertex_count, 3))
+			for start in range(0, vertex_count, chunk_size):
+				chunk = list(islice(lines, min(chunk_size, vertex_count - start)))
+				rows = parse_rows(chunk)
+				if isinstance(rows, list):
+					rows = array([ row[:3] for row in rows ])
+				vertices[start:start+len(rows)] = rows[:,:3]
+			
+			euler = zeros((4, 4))
+			for start in range(0, face_count, chunk_size):
+				chunk = list(islice(lines, min(chunk_size, face_count - start)))
+				for arity, (faces, source) in group_faces(parse_rows(chunk, int)).items():
+					if arity < 3:
+						continue
+					euler += array(AffineEulerMat(vertices[fan_triangulate(faces)], fun))
+		finally:
+			f.close()
+		
+		if euler[-1][-1] == 0:
+			barycenter = zeros(3)
+		else:
+			barycenter = euler[-1][:-1] / euler[-1][-1]
+		
+		return euler, barycenter
 		
 if __name__ == "__main__":
 	
@@ -67,3 +925,13 @@ if __name__ == "__main__":
 	parser = ParserOff()
 	mesh = parser.parse(file_name)
 	print mesh
+	
+	# faces of mixed sizes, the first one as long as the average
+	lines = ["4 0 1 2 3", "3 4 5 6", "3 4 6 7", "6 0 1 5 6 2 3"]
+	triangles, face_map = triangulate(group_faces(parse_rows(lines, int)))
+	print "mixed faces =>", len(triangles), "triangles of faces", face_map.tolist(), "\n"
+	
+	for file_name in ["cube_tri.off", "tetra.off"]:
+		surface = parser.parse(file_name).to_list()
+		print file_name, "III - III_tetra => ", \
+			array(AffineEulerMat(surface, III)) - array(AffineEulerMat(surface, III_tetra)), "\n"
@@ -0,0 +1,357 @@
+import os
+import re
+from numpy import *
+from Mesh import *
+from ParserOFF import build_mesh, group_faces
+
+PLY_TYPES = {
+	"char": "i1", "int8": "i1", "uchar": "u1", "uint8": "u1",
+	"short": "i2", "int16": "i2", "ushort": "u2", "uint16": "u2",
+	"int": "i4", "int32": "i4", "uint": "u4", "uint32": "u4",
+	"float": "f4", "float32": "f4", "double": "f8", "float64": "f8"
+}
+
+END_HEADER = re.compile(r"^end_header[ \t]*\r?\n", re.M)
+
+def read_header(data):
+	"""
+	Reads the header of a .ply file.
+	
+	Returns
+	-------
+	header : tuple
+		the format, the elements as (name, count, properties) with
+		the properties as (name, type, list count type or None),
+		and the offset of the body
+	"""
+	
+	match = END_HEADER.search(data) if data.startswith("ply") else None
+	if match is None:
+		raise ValueError("not a .ply file")
+	end = match.start()
+	body = match.end()
+	
+	file_format = None
+	elements = []
+	for line in data[:end].splitlines():
+		words = line.split()
+		if not words:
+			continue
+		if words[0] == "format":
+			file_format = words[1]
+		elif words[0] == "element":
+			elements.append((words[1], int(words[2]), []))
+		elif words[0] == "property" and words[1] == "list":
+			elements[-1][2].append((words[4], PLY_TYPES[words[3]], PLY_TYPES[words[2]]))
+		elif words[0] == "property":
+			elements[-1][2].append((words[2], PLY_TYPES[words[1]], None))
+	
+	return file_format, elements, body
+
+
+def element_dtype(properties, endian, arity=None):
+	"""
+	Gets the record type of an element, its lists having
+	the given number of items.
+	"""
+	
+	fields = []
+	for name, kind, count_kind in properties:
+		if count_kind is None:
+			fields.append((name, endian + kind))
+		else:
+			fields.append((name + "_count", endian + count_kind))
+			fields.append((name, endian + kind, (arity,)))
+	
+	return dtype(fields)
+
+
+def byte_view(data, kind):
+	"""
+	Gets the values of the given type starting at every byte of the data,
+	with no copy.
+	"""
+	
+	kind = dtype(kind)
+	return ndarray(shape=(max(len(data) - kind.itemsize + 1, 0),), dtype=kind, buffer=data, strides=(1,))
+
+
+def record_starts(counts_at, offset, count, count_offset, fixed_size, item_size, window=2**22):
+	"""
+	Finds the offsets of records of variable size, each made of a 
+	fixed part and of a list whose length is stored at a fixed offset.
+	
+	The offset of the next record is known for a record starting at 
+	every byte of a window of the data at once, so that the chain of the 
+	records from the first one is followed by pointer jumping: the 
+	offsets of all the records are found in log2(count) array gathers
+	per window, with no loop on the records.
+	
+	Parameters
+	----------
+	counts_at : ndarray
+		the list length at every byte, see byte_view
+	offset : int
+		the offset of the first record
+	count : int
+		the number of records
+	count_offset : int
+		the offset of the list length in a record
+	fixed_size : int
+		the size of a record with an empty list
+	item_size : int
+		the size of a list item
+	window : int
+		the number of bytes looked at together
+	
+	Returns
+	-------
+	starts : ndarray, shape(count, )
+		the offsets of the records
+	"""
+	
+	starts = []
+	found = 0
+	while found < count:
+		width = min(window, len(counts_at) - offset - count_offset)
+		if width <= 0:
+			raise ValueError("truncated .ply element")
+		
+		# the next record of a record starting at every byte, the window end absorbing
+		jump = empty(width + 1, dtype=int64)
+		jump[:width] = arange(width) + fixed_size \
+			+ maximum(counts_at[offset+count_offset:offset+count_offset+width].astype(int64), 0) * item_size
+		jump[width] = width
+		jump = minimum(jump, width).astype(int32)
+		
+		n = min(count - found, width // fixed_size + 1)
+		rank = arange(n)
+		chain = zeros(n, dtype=int32)
+		bit = 0
+		while (1 << bit) < n:
+			odd = ((rank >> bit) & 1).astype(bool)
+			chain[odd] = jump.take(chain[odd])
+			jump = jump.take(jump)
+			bit += 1
+		
+		chain = chain[chain < width].astype(int64) + offset
+		starts.append(chain)
+		found += len(chain)
+		last = chain[-1]
+		offset = last + fixed_size + int(counts_at[last + count_offset]) * item_size
+	
+	if len(starts) == 0:
+		return zeros(0, dtype=int64)
+	return concatenate(starts)
+
+
+def read_element(data, offset, count, properties, endian):
+	"""
+	Decodes the records of an element from the given offset.
+	
+	The records are decoded at once when the element has no list, 
+	or when the lists of all the records have the same length as the 
+	first one. With lists of different lengths in a single list property, 
+	the offsets of the records are found by record_starts and every
+	property is gathered at once, the lists grouped by length. 
+	Record by record otherwise.
+	
+	Returns
+	-------
+	element : tuple
+		the records, as a record array, a dict of the properties or 
+		a list of records, and the offset past them. In the dict, 
+		the scalar properties are arrays and the list is grouped by 
+		length as group_faces does
+	"""
+	
+	lists = [ p for p in properties if p[2] is not None ]
+	if not lists or count == 0:
+		record = element_dtype(properties, endian, 0)
+		return frombuffer(data, dtype=record, count=count, offset=offset), offset + count * record.itemsize
+	
+	# the length of the lists of the first record
+	head = element_dtype(properties, endian, 0)
+	first = frombuffer(data, dtype=head, count=1, offset=offset)[0]
+	arity = int(first[lists[0][0] + "_count"])
+	record = element_dtype(properties, endian, arity)
+	
+	if len(lists) == 1 and offset + count * record.itemsize <= len(data):
+		records = frombuffer(data, dtype=record, count=count, offset=offset)
+		if (records[lists[0][0] + "_count"] == arity).all():
+			return records, offset + count * record.itemsize
+	
+	if len(lists) == 1:
+		names = [ p[0] for p in properties ]
+		at = names.index(lists[0][0])
+		before = int(sum([ dtype(kind).itemsize for name, kind, count_kind in properties[:at] ]))
+		after = int(sum([ dtype(kind).itemsize for name, kind, count_kind in properties[at+1:] ]))
+		name, kind, count_kind = lists[0]
+		count_size = dtype(count_kind).itemsize
+		item_size = dtype(kind).itemsize
+		
+		counts_at = byte_view(data, endian + count_kind)
+		starts = record_starts(counts_at, offset, count, before, before + count_size + after, item_size)
+		lengths = counts_at[starts + before].astype(int64)
+		if (lengths < 0).any():
+			raise ValueError("negative list length in .ply element")
+		ends = starts + before + count_size + lengths * item_size + after
+		if ends[-1] > len(data):
+			raise ValueError("truncated .ply element")
+		
+		fields = {}
+		position = 0
+		for p_name, p_kind, p_count_kind in properties[:at]:
+			fields[p_name] = byte_view(data, endian + p_kind)[starts + position]
+			position += dtype(p_kind).itemsize
+		position = -after
+		for p_name, p_kind, p_count_kind in properties[at+1:]:
+			fields[p_name] = byte_view(data, endian + p_kind)[ends + position]
+			position += dtype(p_kind).itemsize
+		
+		items_at = byte_view(data, endian + kind)
+		groups = {}
+		for k in unique(lengths):
+			source = flatnonzero(lengths == k)
+			positions = (starts[source] + before + count_size)[:,newaxis] + arange(k) * item_size
+			groups[int(k)] = (items_at[positions], source)
+		fields[name] = groups
+		
+		return fields, int(ends[-1])
+	
+	records = []
+	for i in range(count):
+		fields = {}
+		for name, kind, count_kind in properties:
+			if count_kind is None:
+				fields[name] = frombuffer(data, dtype=endian + kind, count=1, offset=offset)[0]
+				offset += dtype(kind).itemsize
+			else:
+				n = int(frombuffer(data, dtype=endian + count_kind, count=1, offset=offset)[0])
+				offset += dtype(count_kind).itemsize
+				fields[name] = frombuffer(data, dtype=endian + kind, count=n, offset=offset)
+				offset += n * dtype(kind).itemsize
+		records.append(fields)
+	
+	return records, offset
+
+
+class ParserPly():
+	
+	def __init__(self):
+		
+		self.descr = "Parser for binary .ply file"
+	
+	def __repr__(self):
+		"""
+		Gets the info of this parser.
+		
+		Returns
+		-------
+		info : String
+			info of this parser
+		"""
+		
+		info = "{\n"
+		info += "descr: " + self.descr + "}\n"
+		info += "}"
+		
+		return info
+	
+	def parse_arrays(self, file_name, file_path="../resources"):
+		"""
+		Parses the binary .ply file with the given name in the given path 
+		into arrays.
+		
+		Every element is decoded at once from the file buffer, 
+		see read_element.
+		
+		Parameters
+		----------
+		file_name : String
+			the name of the file to parse
+		file_path : String
+			the path of the file to parse
+			
+		Returns
+		-------
+		vertices : ndarray, shape(N, 3)
+			the coordinates of the vertices
+		groups : dict
+			the faces grouped by number of vertices, see group_faces
+		"""
+		
+		file_path_name = os.path.join(file_path, file_name)
+		data = open(file_path_name, "rb").read()
+		
+		file_format, elements, offset = read_header(data)
+		if file_format == "binary_little_endian":
+			endian = "<"
+		elif file_format == "binary_big_endian":
+			endian = ">"
+		else:
+			raise ValueError("not a binary .ply file: " + file_path_name)
+		
+		vertices = zeros((0, 3))
+		groups = {}
+		for name, count, properties in elements:
+			records, offset = read_element(data, offset, count, properties, endian)
+			if name == "vertex":
+				vertices = column_stack([ asarray(records[c], dtype=float) for c in ["x", "y", "z"] ]).reshape(-1, 3)
+			elif name == "face":
+				index = [ p[0] for p in properties if p[0] in ("vertex_indices", "vertex_index") ][0]
+				if isinstance(records, dict):
+					groups = dict([ (k, (asarray(faces, dtype=int), source)) 
+						for k, (faces, source) in records[index].items() ])
+				elif isinstance(records, list):
+					groups = group_faces([ concatenate([[len(r[index])], r[index]]).astype(int) for r in records ])
+				elif count > 0:
+					faces = asarray(records[index], dtype=int)
+					groups = { faces.shape[1] : (faces, arange(count)) }
+		
+		return vertices, groups
+	
+	def parse(self, file_name, file_path="../resources"):
+		"""
+		Parses the binary .ply file with the given name in the given path.
+		
+		Parameters
+		----------
+		file_name : String
+			the name of the file to parse
+		file_path : String
+			the path of the file to parse
+			
+		Returns
+		-------
+		mesh : Mesh
+			the mesh of which have been parsed the coordinates of the vertices
+		"""
+		
+		vertices, groups = self.parse_arrays(file_name, file_path)
+		
+		return build_mesh(vertices, groups)
+
+
+if __name__ == "__main__":
+	
+	import tempfile
+	
+	header = "ply\nformat binary_little_endian 1.0\n" \
+		"element vertex 3\nproperty float x\nproperty float y\nproperty float z\n" \
+		"element face %d\nproperty list uchar int vertex_indices\nend_header\n"
+	vertices = array([[0, 0, 0], [1, 0, 0], [0, 1, 0]], dtype="<f4").tostring()
+	face = array([3], dtype="u1").tostring() + array([0, 1, 2], dtype="<i4").tostring()
+	
+	parser = ParserPly()
+	file_path = tempfile.mkdtemp()
+	for n_faces in [1, 0]:
+		ply = open(os.path.join(file_path, "face.ply"), "wb")
+		try:
+			ply.write(header % n_faces + vertices + face * n_faces)
+		finally:
+			ply.close()
+		points, groups = parser.parse_arrays("face.ply", file_path)
+		print "element face", n_faces, "=>", len(points), "vertices, groups", groups
+	os.remove(os.path.join(file_path, "face.ply"))
+	os.rmdir(file_path)
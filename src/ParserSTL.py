@@ -0,0 +1,87 @@
+import os
+from numpy import *
+from Mesh import *
+from ParserOFF import build_mesh
+
+## binary STL record: normal, three vertices, attribute byte count
+STL_RECORD = dtype([("normal", "<f4", (3,)), ("vertices", "<f4", (3, 3)), ("attribute", "<u2")])
+STL_HEADER_SIZE = 84
+
+class ParserStl():
+	
+	def __init__(self):
+		
+		self.descr = "Parser for binary .stl file"
+	
+	def __repr__(self):
+		"""
+		Gets the info of this parser.
+		
+		Returns
+		-------
+		info : String
+			info of this parser
+		"""
+		
+		info = "{\n"
+		info += "descr: " + self.descr + "}\n"
+		info += "}"
+		
+		return info
+	
+	def parse_arrays(self, file_name, file_path="../resources"):
+		"""
+		Parses the binary .stl file with the given name in the given path 
+		into arrays, welding the coincident vertices of its triangles.
+		
+		The triangle records are decoded at once from the file buffer.
+		
+		Parameters
+		----------
+		file_name : String
+			the name of the file to parse
+		file_path : String
+			the path of the file to parse
+			
+		Returns
+		-------
+		vertices : ndarray, shape(N, 3)
+			the coordinates of the vertices
+		groups : dict
+			the faces grouped by number of vertices, see group_faces
+		"""
+		
+		file_path_name = os.path.join(file_path, file_name)
+		data = open(file_path_name, "rb").read()
+		
+		if len(data) < STL_HEADER_SIZE:
+			raise ValueError("not a binary .stl file: " + file_path_name)
+		count = int(frombuffer(data, dtype="<u4", count=1, offset=80)[0])
+		if len(data) < STL_HEADER_SIZE + count * STL_RECORD.itemsize:
+			raise ValueError("not a binary .stl file: " + file_path_name)
+		
+		records = frombuffer(data, dtype=STL_RECORD, count=count, offset=STL_HEADER_SIZE)
+		vertices, faces = weld(records["vertices"])
+		
+		return vertices, { 3 : (faces, arange(count)) }
+	
+	def parse(self, file_name, file_path="../resources"):
+		"""
+		Parses the binary .stl file with the given name in the given path.
+		
+		Parameters
+		----------
+		file_name : String
+			the name of the file to parse
+		file_path : String
+			the path of the file to parse
+			
+		Returns
+		-------
+		mesh : Mesh
+			the mesh of which have been parsed the coordinates of the vertices
+		"""
+		
+		vertices, groups = self.parse_arrays(file_name, file_path)
+		
+		return build_mesh(vertices, groups)
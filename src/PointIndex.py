@@ -0,0 +1,210 @@
+from numpy import *
+
+# the offsets of a grid cell and of its 26 neighbours
+NEIGHBOURS = [ (dx, dy, dz) for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1) ]
+
+# the primes mixing the cell coordinates into the keys of the batched queries
+PRIMES = array([73856093, 19349663, 83492791], dtype=int64)
+
+def same_point(p, q, tollerance):
+	"""
+	Tests if the given points are the same with the given tollerance,
+	as Mesh.index_point does: the same sign and a difference below
+	the tollerance on every coordinate.
+	"""
+
+	for a, b in zip(p, q):
+		if (a > 0) - (a < 0) != (b > 0) - (b < 0) or abs(a - b) >= tollerance:
+			return False
+	return True
+
+
+class PointIndex():
+	"""
+	Spatial hash of the points of a mesh, on a grid of cells as large
+	as the tollerance.
+
+	Two points the same with the tollerance lie in the same cell or in
+	two neighbour cells, so that a lookup checks only the points of the
+	27 cells around the given one, in expected constant time.
+	The index keeps the indices of the points only: the coordinates are
+	given to every lookup, and the index must be rebuilt when they move.
+	The cells of the single lookups and the sorted keys of the batched 
+	ones are built on the first lookup of each kind.
+	"""
+
+	def __init__(self, tollerance=10**-7):
+		"""
+		Parameters
+		----------
+		tollerance : float
+			the tollerance of the lookups, and the size of the cells
+		"""
+
+		self.descr = "Spatial hash of points"
+		self.tollerance = tollerance
+		self.cells = None
+		self.n_points = 0
+		self.sorted_keys = None
+		self.sorted_points = None
+
+	def __repr__(self):
+		"""
+		Gets the info of this index.
+
+		Returns
+		-------
+		info : String
+			info of this index
+		"""
+
+		info = "{\n"
+		info += "descr: " + self.descr + "\n"
+		info += "tollerance: " + str(self.tollerance) + "\n"
+		info += "n points: " + str(self.n_points) + "\n"
+		info += "n cells: " + str(len(self.cells or {})) + "\n"
+		info += "}"
+
+		return info
+
+	def cell(self, point):
+		"""
+		Gets the grid cell of the given point.
+		"""
+
+		return tuple(floor(asarray(point, dtype=float) / self.tollerance).astype(int64).tolist())
+
+	def insert(self, index, point):
+		"""
+		Inserts the point of the given index,
+		that must be greater than the indices already inserted.
+		"""
+
+		if self.cells is not None:
+			self.cells.setdefault(self.cell(point), []).append(index)
+		self.n_points += 1
+		self.sorted_keys = None
+
+	def insert_all(self, points, start=0):
+		"""
+		Inserts the given points, with indices from the given start.
+		"""
+
+		points = asarray(points, dtype=float).reshape(-1, 3)
+		if self.cells is not None:
+			cells = floor(points / self.tollerance).astype(int64)
+			for index, cell in enumerate(cells.tolist(), start):
+				self.cells.setdefault(tuple(cell), []).append(index)
+		self.n_points += len(points)
+		self.sorted_keys = None
+
+	def find(self, points, point):
+		"""
+		Gets the lowest index of a point the same as the given one.
+
+		Parameters
+		----------
+		points : ndarray, shape(N, 3)
+			the coordinates of the inserted points
+		point : list
+			the point to look for
+
+		Returns
+		-------
+		index : int
+			the lowest index of a point the same as the given one
+			with the tollerance, -1 if there is none
+		"""
+
+		if self.cells is None:
+			self.cells = {}
+			cells = floor(asarray(points, dtype=float)[:self.n_points] / self.tollerance).astype(int64)
+			for index, cell in enumerate(cells.tolist()):
+				self.cells.setdefault(tuple(cell), []).append(index)
+
+		point = asarray(point, dtype=float).tolist()
+		cx, cy, cz = self.cell(point)
+		best = -1
+		for dx, dy, dz in NEIGHBOURS:
+			for index in self.cells.get((cx + dx, cy + dy, cz + dz), ()):
+				if best >= 0 and index >= best:
+					break
+				if same_point(points[index].tolist(), point, self.tollerance):
+					best = index
+					break
+
+		return best
+
+	def keys(self, cells):
+
+		return (cells * PRIMES).sum(axis=1)
+
+	def find_all(self, points, queries):
+		"""
+		Gets the lowest index of a point the same as every given one,
+		in a few array operations: the inserted points are sorted by
+		the hash key of their cell, and the candidates of every query
+		in each of the 27 cells around it are the ranges of equal keys.
+
+		Parameters
+		----------
+		points : ndarray, shape(N, 3)
+			the coordinates of the inserted points
+		queries : ndarray, shape(Q, 3)
+			the points to look for
+
+		Returns
+		-------
+		indices : ndarray, shape(Q, )
+			the lowest index of a point the same as every query
+			with the tollerance, -1 if there is none
+		"""
+
+		points = asarray(points, dtype=float)[:self.n_points]
+		queries = asarray(queries, dtype=float).reshape(-1, 3)
+
+		if self.sorted_keys is None:
+			keys = self.keys(floor(points / self.tollerance).astype(int64))
+			self.sorted_points = argsort(keys, kind="mergesort")
+			self.sorted_keys = keys[self.sorted_points]
+
+		cells = floor(queries / self.tollerance).astype(int64)
+		best = full(len(queries), self.n_points, dtype=int64)
+		for offset in NEIGHBOURS:
+			keys = self.keys(cells + offset)
+			lo = searchsorted(self.sorted_keys, keys, "left")
+			count = searchsorted(self.sorted_keys, keys, "right") - lo
+			total = count.sum()
+			if total == 0:
+				continue
+			query = repeat(arange(len(queries)), count)
+			position = repeat(lo - cumsum(count) + count, count) + arange(total)
+			candidate = self.sorted_points[position]
+
+			p = points[candidate]
+			q = queries[query]
+			same = (sign(p) == sign(q)).all(axis=1) & (abs(p - q) < self.tollerance).all(axis=1)
+			minimum.at(best, query[same], candidate[same])
+
+		best[best == self.n_points] = -1
+
+		return best
+
+
+if __name__ == "__main__":
+
+	import time
+
+	points = random.rand(20000, 3)
+	index = PointIndex(10**-3)
+	index.insert_all(points)
+	print index
+
+	queries = points[random.randint(0, len(points), 1000)] + 10**-4
+	start = time.time()
+	found = [ index.find(points, q) for q in queries ]
+	print "find x 1000 =>", time.time() - start, "seconds"
+	start = time.time()
+	found_all = index.find_all(points, queries)
+	print "find_all x 1000 =>", time.time() - start, "seconds"
+	print "same results =>", (array(found) == found_all).all()
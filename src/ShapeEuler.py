@@ -97,6 +97,12 @@ def complex2surface (obj):
 ## --Integration utilities---------------------------
 ## --------------------------------------------------
 
+exps = [[2,0,0],[1,1,0],[1,0,1],[1,0,0],
+				[0,2,0],[0,1,1],[0,1,0],
+						[0,0,2],[0,0,1],
+								[0,0,0]]
+
+
 def M (alpha, beta):
 	
 	a = 0.0
@@ -133,6 +139,73 @@ def T3 (triangle, alpha,beta,gamma):
 						* (t[0][0]**(alpha-h)) * (t[0][1]**(beta-k)) \
 						* (t[0][2]**(gamma-m)) * s2
 	return s1 * magnitude(c)
+
+
+def as_triangles(surface):
+	"""
+	Converts a surface to a triangle array.
+	
+	Parameters
+	----------
+	surface : list or ndarray
+		a list of triples of surface vertices (3D points)
+	
+	Returns
+	-------
+	triangles : ndarray, shape(M, 3, 3)
+		the float array of the surface triangles
+	"""
+	
+	return asarray(surface, dtype=float).reshape(-1, 3, 3)
+
+
+def T3_batch(triangles, alpha, beta, gamma):
+	"""
+	Computes T3 over a whole triangle array at once.
+	
+	The loops of T3 run over the exponents only, every term being
+	evaluated for all the triangles with array operations.
+	
+	Parameters
+	----------
+	triangles : ndarray, shape(M, 3, 3)
+		the triangles to integrate on
+	alpha, beta, gamma : int
+		the exponents of the monomial x^alpha y^beta z^gamma
+	
+	Returns
+	-------
+	values : ndarray, shape(M, )
+		the integral of the monomial on every triangle
+	"""
+	
+	t = as_triangles(triangles)
+	a = t[:,1] - t[:,0]
+	b = t[:,2] - t[:,0]
+	c = cross(a, b)
+	
+	n = alpha + beta + gamma
+	a_pow = [[a[:,d]**p for p in range(n+1)] for d in range(3)]
+	b_pow = [[b[:,d]**p for p in range(n+1)] for d in range(3)]
+	t_pow = [[t[:,0,d]**p for p in range(n+1)] for d in range(3)]
+	
+	s1 = zeros(len(t))
+	for h in range(alpha+1):
+		for k in range(beta+1):
+			for m in range(gamma+1):
+				s2 = zeros(len(t))
+				for i in range(h+1):
+					s3 = zeros(len(t))
+					for j in range(k+1):
+						s4 = zeros(len(t))
+						for l in range(m+1):
+							s4 += choose(m,l) * M(h+k+m-i-j-l,i+j+l) * a_pow[2][m-l] * b_pow[2][l]
+						s3 += choose(k,j) * a_pow[1][k-j] * b_pow[1][j] * s4
+					s2 += choose(h,i) * a_pow[0][h-i] * b_pow[0][i] * s3
+				s1 += choose(alpha,h) * choose(beta,k) * choose(gamma,m) \
+						* t_pow[0][alpha-h] * t_pow[1][beta-k] * t_pow[2][gamma-m] * s2
+	
+	return s1 * ((c*c).sum(axis=1) ** 0.5)
 	
 
 ## --------------------------------------------------
@@ -148,6 +221,70 @@ def II(surface,alpha,beta,gamma):
 	
 	return w
 
+II.kind = "surface"
+
+
+def II_batch(surface,alpha,beta,gamma):
+	"""
+	Vectorized version of II, integrating all the triangles at once.
+	"""
+	
+	return T3_batch(surface,alpha,beta,gamma).sum()
+
+II_batch.kind = "surface"
+
+
+def II_fused(surface, reduce=True):
+	"""
+	Computes all the surface integrals of the affine euler matrix
+	in a single pass over the triangles.
+	
+	The 0th, 1st and 2nd order moments of every triangle are given 
+	in closed form by its area A and its vertices v0, v1, v2:
+	A, A/3 (v0+v1+v2), A/12 (v0 v0' + v1 v1' + v2 v2' + s s') 
+	with s = v0+v1+v2.
+	
+	Parameters
+	----------
+	surface : list or ndarray
+		a list of triples of surface vertices (3D points)
+	reduce : boolean
+		true to sum the moments over the surface,
+		false to get the moments of every triangle
+	
+	Returns
+	-------
+	vals : ndarray, shape(10, ) or shape(M, 10)
+		the integrals of the monomials in exps order
+	"""
+	
+	t = as_triangles(surface)
+	c = cross(t[:,1] - t[:,0], t[:,2] - t[:,0])
+	area = ((c*c).sum(axis=1) ** 0.5) / 2.0
+	s = t.sum(axis=1)
+	q = (t[:,:,:,newaxis] * t[:,:,newaxis,:]).sum(axis=1) \
+		+ s[:,:,newaxis] * s[:,newaxis,:]
+	
+	vals = empty((len(t), 10))
+	vals[:,0] = q[:,0,0] / 12.0
+	vals[:,1] = q[:,0,1] / 12.0
+	vals[:,2] = q[:,0,2] / 12.0
+	vals[:,3] = s[:,0] / 3.0
+	vals[:,4] = q[:,1,1] / 12.0
+	vals[:,5] = q[:,1,2] / 12.0
+	vals[:,6] = s[:,1] / 3.0
+	vals[:,7] = q[:,2,2] / 12.0
+	vals[:,8] = s[:,2] / 3.0
+	vals[:,9] = 1.0
+	vals *= area[:,newaxis]
+	
+	if reduce:
+		return vals.sum(axis=0)
+	return vals
+
+II_fused.fused = True
+II_fused.kind = "surface"
+
 
 ## --------------------------------------------------
 ## --Volume integrals--------------------------------
@@ -169,25 +306,244 @@ def III(surface,alpha,beta,gamma):
 	
 	return w/(alpha + 1)
 
+III.kind = "volume"
 
-def AffineEulerMat(surface, fun=III):
+
+def III_batch(surface,alpha,beta,gamma):
+	"""
+	Vectorized version of III, integrating all the triangles at once.
+	"""
+	
+	t = as_triangles(surface)
+	c = cross(t[:,1] - t[:,0], t[:,2] - t[:,0])
+	norm = (c*c).sum(axis=1) ** 0.5
+	norm[norm == 0] = 1.0
+	w = (c[:,0] / norm) * T3_batch(t,alpha+1,beta,gamma)
+	
+	return w.sum()/(alpha + 1)
+
+III_batch.kind = "volume"
+
+
+def III_tetra(surface, reduce=True):
+	"""
+	Computes all the volume integrals of the affine euler matrix
+	in a single pass over the triangles of a closed surface.
+	
+	Every triangle v0, v1, v2 spans with the origin a signed tetrahedron 
+	of volume V = v0 . (v1 x v2) / 6, whose 0th, 1st and 2nd order 
+	moments are V, V/4 (v0+v1+v2), V/20 (v0 v0' + v1 v1' + v2 v2' + s s') 
+	with s = v0+v1+v2. Summed over a closed surface they give the exact 
+	moments of the enclosed volume, with no normal to normalise.
+	
+	Parameters
+	----------
+	surface : list or ndarray
+		a list of triples of surface vertices (3D points)
+	reduce : boolean
+		true to sum the moments over the surface,
+		false to get the moments of every tetrahedron
+	
+	Returns
+	-------
+	vals : ndarray, shape(10, ) or shape(M, 10)
+		the integrals of the monomials in exps order
+	"""
+	
+	t = as_triangles(surface)
+	volume = (t[:,0] * cross(t[:,1], t[:,2])).sum(axis=1) / 6.0
+	s = t.sum(axis=1)
+	q = (t[:,:,:,newaxis] * t[:,:,newaxis,:]).sum(axis=1) \
+		+ s[:,:,newaxis] * s[:,newaxis,:]
+	
+	vals = empty((len(t), 10))
+	vals[:,0] = q[:,0,0] / 20.0
+	vals[:,1] = q[:,0,1] / 20.0
+	vals[:,2] = q[:,0,2] / 20.0
+	vals[:,3] = s[:,0] / 4.0
+	vals[:,4] = q[:,1,1] / 20.0
+	vals[:,5] = q[:,1,2] / 20.0
+	vals[:,6] = s[:,1] / 4.0
+	vals[:,7] = q[:,2,2] / 20.0
+	vals[:,8] = s[:,2] / 4.0
+	vals[:,9] = 1.0
+	vals *= volume[:,newaxis]
+	
+	if reduce:
+		return vals.sum(axis=0)
+	return vals
+
+III_tetra.fused = True
+III_tetra.kind = "volume"
+
+
+def AffineEulerVals(surface, fun=III):
+	"""
+	Gets the ten distinct integrals of the affine euler matrix,
+	in exps order.
+	
+	Parameters
+	----------
+	surface : list or ndarray
+		a list of triples of surface vertices (3D points)
+	fun : function
+		the integration function, called once per exponent triple
+		unless it is a fused kernel computing all of them at once
+	
+	Returns
+	-------
+	vals : list
+		the integrals of the monomials in exps order
+	"""
 	
 	def integFun(surface):
 		def integFun0(pars):
 			return fun(surface,pars[0],pars[1],pars[2])
 		return integFun0
 	
-	exps = [[2,0,0],[1,1,0],[1,0,1],[1,0,0],
-					[0,2,0],[0,1,1],[0,1,0],
-							[0,0,2],[0,0,1],
-									[0,0,0]]
-	vals = AA(integFun(surface))(exps)
+	if getattr(fun, "fused", False):
+		return list(fun(surface))
+	
+	return AA(integFun(surface))(exps)
+
+
+def AffineEulerMat(surface, fun=III):
+	
+	vals = AffineEulerVals(surface, fun)
 	
 	return [[vals[0],vals[1],vals[2],vals[3]],
 			[vals[1],vals[4],vals[5],vals[6]],
 			[vals[2],vals[5],vals[7],vals[8]],
 			[vals[3],vals[6],vals[8],vals[9]]]
 
+
+def pack_surfaces(surfaces):
+	"""
+	Packs many surfaces in a single triangle array.
+	
+	Parameters
+	----------
+	surfaces : list
+		the surfaces, each a list of triples of vertices (3D points)
+	
+	Returns
+	-------
+	triangles : ndarray, shape(M, 3, 3)
+		the triangles of all the surfaces, one surface after the other
+	offsets : ndarray, shape(N+1, )
+		the triangles of the i-th surface are triangles[offsets[i]:offsets[i+1]]
+	"""
+	
+	arrays = [ as_triangles(surface) for surface in surfaces ]
+	offsets = cumsum([0] + [ len(t) for t in arrays ])
+	
+	if len(arrays) == 0:
+		return zeros((0, 3, 3)), offsets
+	return concatenate(arrays), offsets
+
+
+def AffineEulerMatBatch(triangles, offsets, fun=II_fused):
+	"""
+	Computes the affine euler matrices of many surfaces packed 
+	in a single triangle array, see pack_surfaces.
+	
+	The moments of all the triangles are computed at once by the fused 
+	kernel, then summed surface by surface with a segmented reduction.
+	
+	Parameters
+	----------
+	triangles : ndarray, shape(M, 3, 3)
+		the triangles of all the surfaces
+	offsets : ndarray, shape(N+1, )
+		the triangles of the i-th surface are triangles[offsets[i]:offsets[i+1]]
+	fun : function
+		a fused kernel, as II_fused or III_tetra
+	
+	Returns
+	-------
+	euler : ndarray, shape(N, 4, 4)
+		the affine euler matrices of the surfaces
+	barycenter : ndarray, shape(N, 3)
+		the barycenters of the surfaces, zero for empty ones
+	axes : ndarray, shape(N, 3, 3)
+		the principal axes of the surfaces, as rows sorted by 
+		increasing eigenvalue
+	"""
+	
+	if not getattr(fun, "fused", False):
+		raise ValueError("AffineEulerMatBatch needs a fused kernel")
+	
+	offsets = asarray(offsets, dtype=int)
+	n = len(offsets) - 1
+	vals = fun(triangles, reduce=False)
+	ids = repeat(arange(n), diff(offsets))
+	sums = array([ bincount(ids, weights=vals[:,k], minlength=n) for k in range(10) ]).T
+	
+	index = array([[0,1,2,3], [1,4,5,6], [2,5,7,8], [3,6,8,9]])
+	euler = sums[:,index]
+	
+	mass = euler[:,3,3]
+	barycenter = zeros((n, 3))
+	nonzero = mass != 0
+	barycenter[nonzero] = euler[nonzero,3,:3] / mass[nonzero,newaxis]
+	
+	axes = transpose(linalg.eigh(euler[:,:3,:3])[1], (0, 2, 1))
+	
+	return euler, barycenter, axes
+
+
+def TransformEulerMat(euler, matrix, translation=zeros(3), kind="volume"):
+	"""
+	Transforms an affine euler matrix under the map x -> matrix x + translation,
+	without integrating again.
+	
+	With p = [x, y, z, 1] and H = [[matrix, translation], [0, 1]] the 
+	integrals of p p' on the mapped domain are f H E H', where f is the 
+	jacobian of the map on the domain: det(matrix) for volume integrals,
+	keeping the orientation sign of III, and s^2 for surface integrals 
+	when the map is a similarity of ratio s.
+	
+	The volume integrals of III, III_batch and III_tetra follow this
+	rule only on closed surfaces, every edge shared by two triangles:
+	on open ones they depend on the placement of the surface, and must
+	be computed again.
+	
+	Parameters
+	----------
+	euler : float matrix 4 x 4
+		the affine euler matrix to transform
+	matrix : ndarray, shape(3, 3)
+		the linear part of the map
+	translation : ndarray, shape(3, )
+		the translation part of the map
+	kind : String
+		"volume" or "surface", the kind of the integrals of euler
+	
+	Returns
+	-------
+	euler : ndarray, shape(4, 4)
+		the transformed affine euler matrix, 
+		or None if it cannot be computed from euler
+	"""
+	
+	matrix = asarray(matrix, dtype=float)
+	H = identity(4)
+	H[:3,:3] = matrix
+	H[:3,3] = translation
+	
+	if kind == "volume":
+		f = linalg.det(matrix)
+	elif kind == "surface":
+		gram = dot(matrix.T, matrix)
+		s2 = gram.trace() / 3.0
+		if not allclose(gram, s2 * identity(3), rtol=1e-9, atol=1e-12 * max(s2, 1.0)):
+			return None
+		f = s2
+	else:
+		return None
+	
+	return f * dot(dot(H, euler), H.T)
+
 if __name__ == "__main__":
 	print "\n## -- Surface integral --------------"
 	
@@ -229,6 +585,14 @@ if __name__ == "__main__":
 
 	__evalprint__(""" AffineEulerMat(cube_v1, II) """)
 
+	__evalprint__(""" AffineEulerMat(cube_v1, II_batch) """)
+
+	__evalprint__(""" AffineEulerMat(cube_v1, II_fused) """)
+
+	__evalprint__(""" AffineEulerMat(cube_v1, III_batch) """)
+
+	__evalprint__(""" AffineEulerMat(cube_v1, III_tetra) """)
+
 	t0 = [[5, 0, 0], [0, 0, 0], [5, 5, 0]]
 	t1 = [[5, 5, 0], [0, 0, 0], [0, 5, 0]]
 
@@ -256,6 +620,14 @@ if __name__ == "__main__":
 	__evalprint__(""" AffineEulerMat(cube_v2) """)
 
 	__evalprint__(""" AffineEulerMat(cube_v2, II) """)
+
+	__evalprint__(""" AffineEulerMat(cube_v2, II_batch) """)
+
+	__evalprint__(""" AffineEulerMat(cube_v2, II_fused) """)
+
+	__evalprint__(""" AffineEulerMat(cube_v2, III_batch) """)
+
+	__evalprint__(""" AffineEulerMat(cube_v2, III_tetra) """)
 	
 	__evalprint__(""" 
 		II([[[0.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]],
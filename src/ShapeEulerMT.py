@@ -37,9 +37,12 @@ from scipy import *
 from pyplasm import *
 from Queue import Queue
 from threading import Thread
-from multiprocessing import Pool as PPool, Lock
-from multiprocessing.sharedctypes import Value, Array
-from ctypes import Structure, c_double
+from threading import Lock, RLock
+from multiprocessing import Pool as PPool, cpu_count
+from multiprocessing.sharedctypes import RawArray
+from ctypes import c_double
+import atexit
+from ShapeEuler import as_triangles, AffineEulerVals, III_batch
 
 ## --------------------------------------------------
 ## --Utility functions-------------------------------
@@ -185,54 +188,119 @@ def III(surface,alpha,beta,gamma):
 		w += (c[0] / magnitude(c)) * T3(triangle,alpha+1,beta,gamma)
 	return w/(alpha + 1)
 
-def temp_f(x):
-	return x*x
+
+## --------------------------------------------------
+## --Process pool------------------------------------
+## --------------------------------------------------
+
+mp_state = {"pool": None, "buffer": None, "capacity": 0, "processes": None}
+mp_lock = Lock()
+mp_buffer = None
+
+def mp_init(buffer):
+	"""
+	Initializes a pool process with the shared triangle buffer,
+	inherited by the process instead of being pickled per task.
+	"""
+	
+	global mp_buffer
+	mp_buffer = buffer
+
+
+def mp_worker(args):
+	"""
+	Integrates a chunk of the triangles in the shared buffer.
+	
+	Returns
+	-------
+	vals : list
+		the partial integrals of the chunk in exps order
+	"""
+	
+	start, stop, integFun = args
+	triangles = frombuffer(mp_buffer, dtype=float)[9*start:9*stop].reshape(-1, 3, 3)
+	
+	return AffineEulerVals(triangles, integFun)
+
+
+def mp_pool(size, processes=None):
+	"""
+	Gets the persistent process pool, whose shared buffer can hold
+	the given number of triangles.
+	
+	The pool is created on the first call and kept across calls.
+	It is created again only if the buffer is too small or 
+	a different number of processes is asked.
+	"""
+	
+	if processes is None:
+		processes = mp_state["processes"] or cpu_count()
+	
+	if mp_state["pool"] is None or size > mp_state["capacity"] \
+			or processes != mp_state["processes"]:
+		shutdown_mp()
+		capacity = max(size, 2 * mp_state["capacity"], 1024)
+		buffer = RawArray(c_double, 9 * capacity)
+		mp_state["pool"] = PPool(processes, mp_init, (buffer,))
+		mp_state["buffer"] = buffer
+		mp_state["capacity"] = capacity
+		mp_state["processes"] = processes
+	
+	return mp_state["pool"]
+
+
+def shutdown_mp():
+	"""
+	Stops the persistent process pool, if any.
+	"""
+	
+	if mp_state["pool"] is not None:
+		mp_state["pool"].close()
+		mp_state["pool"].join()
+	mp_state["pool"] = None
+	mp_state["buffer"] = None
+	mp_state["capacity"] = 0
+
+atexit.register(shutdown_mp)
+
+
+def AffineEulerMatMP(surface, integFun=III_batch, processes=None, chunks_per_process=4):
+	"""
+	Computes the affine euler matrix on a persistent process pool.
+	
+	The triangles are copied once in a shared buffer and split in chunks,
+	each process summing the integrals of its chunks.
+	
+	Parameters
+	----------
+	surface : list or ndarray
+		a list of triples of surface vertices (3D points)
+	integFun : function
+		the integration function, it must be picklable
+	processes : int
+		the number of processes of the pool,
+		by default the one of the running pool or the number of cpus
+	chunks_per_process : int
+		the number of chunks given to every process, for load balance
+	
+	Returns
+	-------
+	euler : float matrix 4 x 4
+		the affine euler matrix of the surface
+	"""
+	
+	triangles = as_triangles(surface)
+	size = len(triangles)
+	
+	with mp_lock:
+		pool = mp_pool(size, processes)
+		frombuffer(mp_state["buffer"], dtype=float)[:9*size] = triangles.ravel()
+		
+		n_chunks = max(1, min(size, mp_state["processes"] * chunks_per_process))
+		bounds = linspace(0, size, n_chunks + 1).astype(int)
+		args = [ (bounds[i], bounds[i+1], integFun) for i in range(n_chunks) ]
 		
-def AffineEulerMatMP(surface, integFun=III):
-	
-	class Point(Structure):
-		_fields_ = [('x', c_double), ('y', c_double), ('z', c_double)]
-	
-	class Triangle(Structure):
-		 _fields_ = [('p1', Point), ('p2', Point), ('p3', Point)]
-		 
-	class Mesh(Structure):
-		_fields_ = [('t1', Triangle), ('t2', Triangle), ('t3', Triangle)]
-	
-	def worker(args):
-		surface, a_b_g = args
-		print a_b_g
-		return integFun(surface, a_b_g[0], a_b_g[1], a_b_g[2])
-
-	exps = [ (2,0,0),(1,1,0),(1,0,1),(1,0,0),
-					 (0,2,0),(0,1,1),(0,1,0),
-							 (0,0,2),(0,0,1),
-									 (0,0,0)]
-	lock = Lock()
-	sm = Array(Mesh,  [
-			[
-				(  1.10684363e-01,	 1.56464172e-01,  -5.74590188e-01),
-				(  1.21419029e-01,	 1.86064960e-01,  -5.91296960e-01),
-				(  1.07820363e-01,	 1.39793305e-01,  -5.93377407e-01)
-			],
-
-			[
-				(  1.25185426e-02,	-4.36747846e-01,  -4.99162935e-01),
-				(  5.34538511e-04,	-4.34139706e-01,  -4.98260808e-01),
-				(  2.12700518e-02,	-4.43868113e-01,  -5.01638115e-01)
-			],
-
-			[
-				( -2.01650403e-02,	-4.43875375e-01,  -5.01662549e-01),
-				(  5.34538511e-04,	-4.34139706e-01,  -4.98260808e-01),
-				( -1.14189529e-02,	-4.36752042e-01,  -4.99177050e-01)
-			]
-		], lock=lock)
-	
-	args = [ (sm, exp) for exp in exps]
-	
-	p = PPool()
-	out = p.map(worker, args)
+		out = array(pool.map(mp_worker, args)).sum(axis=0)
 	
 	return [[out[0],out[1],out[2],out[3]],
 			[out[1],out[4],out[5],out[6]],
@@ -240,30 +308,127 @@ def AffineEulerMatMP(surface, integFun=III):
 			[out[3],out[6],out[8],out[9]]]	 
 
 
-def AffineEulerMatMT(surface, integFun=III, num_workers=5):
+## --------------------------------------------------
+## --Thread pool-------------------------------------
+## --------------------------------------------------
 
-	def worker():
-		while True:
-			indx, a_b_g = q.get()
-			out[indx] = integFun(surface, a_b_g[0], a_b_g[1], a_b_g[2])
+mt_state = {"queue": None, "threads": [], "num_workers": 5}
+mt_lock = RLock()
+
+def mt_worker(q):
+	"""
+	Integrates the chunks got from the given queue, until a None task.
+	"""
+	
+	while True:
+		task = q.get()
+		if task is None:
 			q.task_done()
+			return
+		done, indx, triangles, integFun = task
+		try:
+			done.put((indx, AffineEulerVals(triangles, integFun)))
+		except Exception, e:
+			done.put((indx, e))
+		q.task_done()
 
-	exps = [ [2,0,0],[1,1,0],[1,0,1],[1,0,0],
-					 [0,2,0],[0,1,1],[0,1,0],
-							 [0,0,2],[0,0,1],
-									 [0,0,0]]
+
+def mt_pool():
+	"""
+	Gets the queue of the persistent thread pool,
+	starting its threads on the first call.
+	"""
+	
+	with mt_lock:
+		if mt_state["queue"] is None:
+			q = Queue()
+			threads = []
+			for i in range(mt_state["num_workers"]):
+				t = Thread(target=mt_worker, args=(q,))
+				t.setDaemon(True)
+				t.start()
+				threads.append(t)
+			mt_state["queue"] = q
+			mt_state["threads"] = threads
+		
+		return mt_state["queue"]
+
+
+def shutdown_mt():
+	"""
+	Stops the threads of the persistent thread pool, if any.
+	"""
 	
-	q = Queue()
-	out = {}
+	with mt_lock:
+		q = mt_state["queue"]
+		if q is not None:
+			for t in mt_state["threads"]:
+				q.put(None)
+			for t in mt_state["threads"]:
+				t.join()
+		mt_state["queue"] = None
+		mt_state["threads"] = []
+
+
+def set_num_workers(num_workers):
+	"""
+	Sets the number of threads of the persistent thread pool,
+	restarting it if it is running with a different number.
+	"""
 	
-	for i in range(num_workers):
-		t = Thread(target=worker)
-		t.setDaemon(True)
-		t.start()
-	for i in range(len(exps)):
-		q.put((i,exps[i])) 
-	q.join()
+	with mt_lock:
+		if num_workers != mt_state["num_workers"]:
+			shutdown_mt()
+			mt_state["num_workers"] = num_workers
+
+atexit.register(shutdown_mt)
 
+
+def AffineEulerMatMT(surface, integFun=III_batch, num_workers=None, chunks_per_worker=4):
+	"""
+	Computes the affine euler matrix on a persistent thread pool.
+	
+	The triangles are split in chunks integrated by vectorized kernels,
+	whose array operations release the GIL and run in parallel.
+	
+	Parameters
+	----------
+	surface : list or ndarray
+		a list of triples of surface vertices (3D points)
+	integFun : function
+		the integration function
+	num_workers : int
+		the number of threads of the pool, see set_num_workers
+	chunks_per_worker : int
+		the number of chunks given to every thread, for load balance
+	
+	Returns
+	-------
+	euler : float matrix 4 x 4
+		the affine euler matrix of the surface
+	"""
+	
+	triangles = as_triangles(surface)
+	done = Queue()
+	
+	# the chunks are queued before any shutdown of the pool can queue its stops
+	with mt_lock:
+		if num_workers is not None:
+			set_num_workers(num_workers)
+		q = mt_pool()
+		
+		n_chunks = max(1, min(len(triangles), mt_state["num_workers"] * chunks_per_worker))
+		bounds = linspace(0, len(triangles), n_chunks + 1).astype(int)
+		for i in range(n_chunks):
+			q.put((done, i, triangles[bounds[i]:bounds[i+1]], integFun))
+	
+	out = zeros(10)
+	for i in range(n_chunks):
+		indx, vals = done.get()
+		if isinstance(vals, Exception):
+			raise vals
+		out += vals
+	
 	return [[out[0],out[1],out[2],out[3]],
 			[out[1],out[4],out[5],out[6]],
 			[out[2],out[5],out[7],out[8]],
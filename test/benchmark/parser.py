@@ -0,0 +1,30 @@
+import os
+import sys
+import time
+
+dirname = os.path.realpath(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(dirname, '..', '..', 'src'))
+resources = os.path.join(dirname, '..', '..', 'resources')
+
+from ParserOFF import *
+
+def bench(parse, file_name, repeat=5):
+	best = None
+	for i in range(repeat):
+		start = time.time()
+		parse(file_name, resources)
+		elapsed = time.time() - start
+		if best is None or elapsed < best:
+			best = elapsed
+	return best
+
+if __name__ == '__main__':
+	parser = ParserOff()
+	for file_name in sorted(os.listdir(resources)):
+		if os.path.splitext(file_name)[-1] != '.off':
+			continue
+		size = os.path.getsize(os.path.join(resources, file_name)) / 1e6
+		t_arrays = bench(parser.parse_arrays, file_name)
+		t_mesh = bench(parser.parse, file_name)
+		print "%-14s %8.3f MB  parse_arrays %8.4f s %8.1f MB/s  parse %8.4f s %8.1f MB/s" % \
+			(file_name, size, t_arrays, size / t_arrays, t_mesh, size / t_mesh)